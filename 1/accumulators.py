@@ -0,0 +1,604 @@
+"""
+Single-pass accumulator framework for the treebank analyses
+Linguistic Data 3 - Assignment on Descriptive Analysis of Hindi Data
+
+Each analysis is an Analysis subclass that registers per-sentence and/or
+per-token hooks. An AnalysisPass feeds TokenStores (a whole corpus or one
+file at a time) through every hook in a single walk, so the report can be
+computed while streaming files without keeping the parsed corpus around.
+
+Analyses hold only mergeable aggregates (counters, sums, sets), so a pass
+over one file is a partial result that can be persisted and merged with
+the partials of other files to give exactly the whole-corpus numbers.
+"""
+
+from collections import Counter
+from decimal import Context, Decimal
+
+from sketches import FixedHistogram, HyperLogLog, Welford
+
+
+class StoreView:
+    """A TokenStore plus per-code lookups shared by all hooks of one pass"""
+
+    def __init__(self, store, decode_morph):
+        self.store = store
+        self.ids = store.ids
+        self.heads = store.heads
+        self.morphs = store.column('morph')
+        self.deprels = store.column('deprel')
+        self.pos_short = store.column('pos_short')
+        self.pos_full = store.column('pos_full')
+        self.words = store.column('word')
+        # SentenceIndex of the sentence being visited, if any analysis uses one
+        self.index = None
+        # (vibhakti, case) per morph code, decoded once per distinct string
+        decoded = [decode_morph(m) for m in store.vocab('morph').strings]
+        self.vib_by_morph = [d[0] for d in decoded]
+        self.case_by_morph = [d[1] for d in decoded]
+
+    def string(self, name, row):
+        return self.store.vocab(name)[self.store.column(name)[row]]
+
+    def code(self, name, s):
+        return self.store.vocab(name).get(s)
+
+    def vib(self, row):
+        return self.vib_by_morph[self.morphs[row]]
+
+    def case(self, row):
+        return self.case_by_morph[self.morphs[row]]
+
+
+class Analysis:
+    """Base class for accumulators; override the hooks an analysis needs
+
+    Analyses that set uses_index = True find the current sentence's
+    SentenceIndex (head -> dependents, deprel -> rows, ID -> row) in
+    view.index during visit_sentence. It is built once per sentence and
+    shared by every analysis in the pass.
+    """
+
+    uses_index = False
+
+    def begin_store(self, view):
+        """Called once per store before its sentences are visited"""
+
+    def visit_sentence(self, view, start, end):
+        """Called once per sentence with its row range"""
+
+    def visit_token(self, view, row):
+        """Called once per token row"""
+
+    def merge(self, other):
+        """Fold another instance's aggregates (e.g. a later file's) into self"""
+        raise NotImplementedError
+
+    def report(self, analyzer):
+        """Print the section and save plots using analyzer's helpers"""
+        raise NotImplementedError
+
+    def __getstate__(self):
+        # Attributes starting with '_' are per-store lookups, not aggregates
+        return {k: v for k, v in self.__dict__.items() if not k.startswith('_')}
+
+
+def _overrides(analysis, hook):
+    return getattr(type(analysis), hook) is not getattr(Analysis, hook)
+
+
+class AnalysisPass:
+    """Drives a set of analyses over one or more stores in a single walk"""
+
+    def __init__(self, analyses, get_vibhakti, get_case_from_morph):
+        self.analyses = list(analyses)
+        self.store_hooks = [a.begin_store for a in self.analyses if _overrides(a, 'begin_store')]
+        self.sentence_hooks = [a.visit_sentence for a in self.analyses if _overrides(a, 'visit_sentence')]
+        self.token_hooks = [a.visit_token for a in self.analyses if _overrides(a, 'visit_token')]
+        self.uses_index = any(a.uses_index for a in self.analyses)
+        self._get_vibhakti = get_vibhakti
+        self._get_case = get_case_from_morph
+        self._morph_cache = {}
+        self.num_sentences = 0
+        self.num_tokens = 0
+
+    def _decode_morph(self, morph):
+        decoded = self._morph_cache.get(morph)
+        if decoded is None:
+            decoded = (self._get_vibhakti(morph), self._get_case(morph))
+            self._morph_cache[morph] = decoded
+        return decoded
+
+    def feed(self, store):
+        """Run every hook over all sentences of store"""
+        view = StoreView(store, self._decode_morph)
+        for hook in self.store_hooks:
+            hook(view)
+        sentence_hooks = self.sentence_hooks
+        token_hooks = self.token_hooks
+        uses_index = self.uses_index
+        for start, end in store.sentence_bounds():
+            if uses_index:
+                view.index = store.sentence_index(start, end)
+            for hook in sentence_hooks:
+                hook(view, start, end)
+            for row in range(start, end):
+                for hook in token_hooks:
+                    hook(view, row)
+        self.num_sentences += store.num_sentences
+        self.num_tokens += store.num_tokens
+
+    def partial(self):
+        """Picklable aggregates of everything fed so far"""
+        return (self.num_sentences, self.num_tokens, self.analyses)
+
+    def merge_partial(self, partial):
+        """Merge a partial() from a pass over the same analysis classes"""
+        num_sentences, num_tokens, analyses = partial
+        self.num_sentences += num_sentences
+        self.num_tokens += num_tokens
+        for analysis, other in zip(self.analyses, analyses):
+            analysis.merge(other)
+
+    def report(self, analyzer):
+        for analysis in self.analyses:
+            analysis.report(analyzer)
+
+
+class BasicStatistics(Analysis):
+    """1. Basic Corpus Statistics"""
+
+    def __init__(self):
+        self.total_sentences = 0
+        self.total_tokens = 0
+        self.word_types = set()
+        self.min_length = None
+        self.max_length = None
+
+    def begin_store(self, view):
+        self.word_types.update(view.store.vocab('word').strings)
+
+    def visit_sentence(self, view, start, end):
+        length = end - start
+        self.total_sentences += 1
+        self.total_tokens += length
+        if self.min_length is None or length < self.min_length:
+            self.min_length = length
+        if self.max_length is None or length > self.max_length:
+            self.max_length = length
+
+    def merge(self, other):
+        self.total_sentences += other.total_sentences
+        self.total_tokens += other.total_tokens
+        self.word_types |= other.word_types
+        if other.min_length is not None:
+            self.min_length = other.min_length if self.min_length is None else min(self.min_length, other.min_length)
+            self.max_length = other.max_length if self.max_length is None else max(self.max_length, other.max_length)
+
+    def describe_word_types(self):
+        return f"{len(self.word_types)}"
+
+    def report(self, analyzer):
+        print("=" * 60)
+        print("1. BASIC CORPUS STATISTICS")
+        print("=" * 60)
+
+        total_sentences = self.total_sentences
+        total_tokens = self.total_tokens
+        word_types = self.describe_word_types()
+
+        print(f"(a) Total number of sentences: {total_sentences}")
+        print(f"(b) Total number of word tokens (excluding punctuation): {total_tokens}")
+        print(f"(c) Total number of word types (excluding punctuation): {word_types}")
+
+        if total_sentences > 0:
+            avg_length = total_tokens / total_sentences
+            print(f"(d) Average sentence length: {avg_length:.2f} tokens")
+
+        if self.min_length is not None:
+            print(f"(e) Minimum sentence length: {self.min_length} tokens")
+            print(f"    Maximum sentence length: {self.max_length} tokens")
+        print()
+
+
+class WordOrder(Analysis):
+    """2. Word Order Patterns Analysis (Dependency-aware, Hindi-safe)"""
+
+    uses_index = True
+
+    def __init__(self):
+        self.subject_count = 0
+        self.object_count = 0
+        self.main_verb_count = 0
+        self.word_order_patterns = Counter()
+
+    def begin_store(self, view):
+        self._main = view.code('deprel', 'main')
+        self._k1 = view.code('deprel', 'k1')
+        self._k2 = view.code('deprel', 'k2')
+        self._verbal_pos = view.store.vocab('pos_short').codes_where(lambda p: p.startswith('V'))
+
+    def visit_sentence(self, view, start, end):
+        index = view.index
+        pos_short = view.pos_short
+
+        # identify main verb (predicate head); positions are offsets within the sentence
+        verb = index.first_with_deprel(self._main)
+        if verb is None:
+            return
+
+        self.main_verb_count += 1
+        verb_id = view.ids[verb]
+        dependents = index.dependents(verb_id)
+
+        # collect auxiliaries attached to main verb
+        verb_positions = [verb - start]
+        for r in dependents:
+            if pos_short[r] in self._verbal_pos:
+                verb_positions.append(r - start)
+
+        # take the RIGHTMOST verb element (surface verb position)
+        verb_pos = max(verb_positions)
+
+        # find subject and object linked to the verb
+        subj = index.first_with_deprel(self._k1, head=verb_id)
+        obj  = index.first_with_deprel(self._k2, head=verb_id)
+
+        if subj is not None:
+            self.subject_count += 1
+        if obj is not None:
+            self.object_count += 1
+
+        # only count clean S–O–V sentences
+        if subj is not None and obj is not None:
+            s_pos = subj - start
+            o_pos = obj - start
+
+            order = sorted(
+                [('S', s_pos), ('O', o_pos), ('V', verb_pos)],
+                key=lambda x: x[1]
+            )
+            pattern = ''.join(x[0] for x in order)
+            self.word_order_patterns[pattern] += 1
+
+    def merge(self, other):
+        self.subject_count += other.subject_count
+        self.object_count += other.object_count
+        self.main_verb_count += other.main_verb_count
+        self.word_order_patterns.update(other.word_order_patterns)
+
+    def report(self, analyzer):
+        print("=" * 60)
+        print("2. WORD ORDER PATTERNS")
+        print("=" * 60)
+
+        word_order_patterns = self.word_order_patterns
+
+        print(f"(a) Frequencies of key dependency relations:")
+        print(f"    Subject (k1): {self.subject_count}")
+        print(f"    Object (k2): {self.object_count}")
+        print(f"    Main verb (main): {self.main_verb_count}")
+
+        print(f"\n(b) Word order patterns found:")
+        total = sum(word_order_patterns.values())
+        for pat, cnt in word_order_patterns.most_common():
+            print(f"    {pat}: {cnt} ({(cnt/total)*100:.2f}%)")
+
+        print(f"\n(c) Discussion:")
+        if word_order_patterns:
+            top = word_order_patterns.most_common(1)[0]
+            print(f"    Dominant pattern: {top[0]} ({top[1]} occurrences)")
+            if 'SOV' in word_order_patterns:
+                print(
+                    f"    SOV frequency: {word_order_patterns['SOV']} "
+                    f"({(word_order_patterns['SOV']/total)*100:.2f}%)"
+                )
+
+        # plot
+        analyzer.plot_frequency_distribution(
+            word_order_patterns,
+            "Word Order Patterns",
+            "plot_word_order.png",
+            xlabel="Pattern"
+        )
+
+
+class CaseMarkers(Analysis):
+    """3. Case Marker and Vibhakti Analysis"""
+
+    def __init__(self):
+        self.vibhakti_distribution = Counter()
+        self.unmarked_noun_count = 0
+        self.total_nouns = 0
+
+    def begin_store(self, view):
+        self._nouns = view.store.vocab('pos_full').codes_where(lambda p: p.startswith('NN'))
+
+    def visit_token(self, view, row):
+        # Collect Vibhakti stats (The actual Markers)
+        vib = view.vib(row)
+        if vib:
+            self.vibhakti_distribution[vib] += 1
+
+        # Count Unmarked Nouns
+        # Nouns usually include NN, NNP, NNC, NNPC
+        if view.pos_full[row] in self._nouns:
+            self.total_nouns += 1
+
+            # Definition of Unmarked:
+            # 1. Has 'case-d' (Direct State) OR
+            # 2. Has no explicit Vibhakti marker
+            if view.case(row) == 'unmarked' or vib is None:
+                self.unmarked_noun_count += 1
+
+    def merge(self, other):
+        self.vibhakti_distribution.update(other.vibhakti_distribution)
+        self.unmarked_noun_count += other.unmarked_noun_count
+        self.total_nouns += other.total_nouns
+
+    def report(self, analyzer):
+        print("=" * 60)
+        print("3. CASE MARKER AND VIBHAKTI ANALYSIS")
+        print("=" * 60)
+
+        vibhakti_distribution = self.vibhakti_distribution
+
+        print(f"(a) All Case Markers (Vibhaktis):")
+        total_vib = sum(vibhakti_distribution.values())
+
+        # PRINT ALL (No Limit)
+        for v, c in vibhakti_distribution.most_common():
+             print(f"    {v}: {c} ({(c/total_vib)*100:.2f}%)")
+
+        print(f"\n(b) Unmarked Nouns (No case marker/Direct case):")
+        print(f"    Count: {self.unmarked_noun_count}")
+        if self.total_nouns > 0:
+            print(f"    Percentage of total nouns: {(self.unmarked_noun_count/self.total_nouns)*100:.2f}%")
+        print()
+
+        # Save Plot (Top 20 for readability)
+        analyzer.plot_frequency_distribution(
+            vibhakti_distribution,
+            "Case Marker Distribution",
+            "plot_case_markers.png",
+            top_n=20, # Plot only top 20 to keep chart readable
+            xlabel="Vibhakti Marker"
+        )
+
+
+class DistanceMoments:
+    """Exact count, sum and sum of squares of integer distances"""
+
+    def __init__(self):
+        self.n = 0
+        self.total = 0
+        self.total_sq = 0
+
+    def add(self, dist):
+        self.n += 1
+        self.total += dist
+        self.total_sq += dist * dist
+
+    def merge(self, other):
+        self.n += other.n
+        self.total += other.total
+        self.total_sq += other.total_sq
+
+    def mean(self):
+        return self.total / self.n if self.n else 0
+
+    def stdev(self):
+        """Sample standard deviation, as statistics.stdev on the raw values"""
+        if self.n < 2:
+            return 0.0
+        # Exact integer variance numerator/denominator, square-rooted at high precision
+        ss = self.n * self.total_sq - self.total * self.total
+        ctx = Context(prec=60)
+        return float(ctx.divide(Decimal(ss), Decimal(self.n * (self.n - 1))).sqrt(ctx))
+
+
+class InterveningDistance(Analysis):
+    """4. Intervening Distance Analysis"""
+
+    def __init__(self):
+        self.distances = DistanceMoments()
+        self.same_marker = DistanceMoments()
+        self.diff_marker = DistanceMoments()
+
+    def visit_sentence(self, view, start, end):
+        # Find all tokens with an explicit Case Marker (Vibhakti)
+        marked_tokens = []
+        for row in range(start, end):
+            vib = view.vib(row)
+            if vib: # Only consider tokens that actually HAVE a marker
+                marked_tokens.append((row - start, vib))
+
+        for (idx_a, marker_a), (idx_b, marker_b) in zip(marked_tokens, marked_tokens[1:]):
+            # Distance calculation excludes punctuation (already excluded from list)
+            # Distance = IndexB - IndexA - 1
+            dist = max(idx_b - idx_a - 1, 0)
+
+            self.distances.add(dist)
+
+            # Check if markers are same or different strings
+            if marker_a == marker_b:
+                self.same_marker.add(dist)
+            else:
+                self.diff_marker.add(dist)
+
+    def merge(self, other):
+        self.distances.merge(other.distances)
+        self.same_marker.merge(other.same_marker)
+        self.diff_marker.merge(other.diff_marker)
+
+    def report(self, analyzer):
+        print("=" * 60)
+        print("4. INTERVENING DISTANCE ANALYSIS")
+        print("=" * 60)
+
+        distances = self.distances
+        same_marker = self.same_marker
+        diff_marker = self.diff_marker
+
+        if distances.n:
+            avg_dist = distances.mean()
+            stdev_dist = distances.stdev()
+
+            print(f"(a) Average intervening words between case markers: {avg_dist:.2f}")
+            print(f"    Standard Deviation: {stdev_dist:.2f}")
+
+            avg_same = same_marker.mean()
+            avg_diff = diff_marker.mean()
+
+            print(f"\n(b) Avg distance for SAME markers: {avg_same:.2f} (n={same_marker.n})")
+            print(f"    Avg distance for DIFFERENT markers: {avg_diff:.2f} (n={diff_marker.n})")
+
+            print(f"\n(c) Discussion:")
+            if avg_same < avg_diff:
+                print("    Same markers appear closer together.")
+            else:
+                print("    Different markers appear closer together.")
+
+
+class SketchBasicStatistics(BasicStatistics):
+    """1. Basic Corpus Statistics, counting word types with HyperLogLog"""
+
+    def __init__(self):
+        super().__init__()
+        self.word_types = HyperLogLog()
+
+    def describe_word_types(self):
+        return f"~{len(self.word_types)} (±{self.word_types.relative_error():.1%} std. error, HyperLogLog)"
+
+
+class DistanceSketch:
+    """Welford moments plus a fixed-bucket histogram of distances"""
+
+    def __init__(self):
+        self.moments = Welford()
+        self.histogram = FixedHistogram()
+
+    @property
+    def n(self):
+        return self.moments.n
+
+    def add(self, dist):
+        self.moments.add(dist)
+        self.histogram.add(dist)
+
+    def merge(self, other):
+        self.moments.merge(other.moments)
+        self.histogram.merge(other.histogram)
+
+    def mean(self):
+        return self.moments.mean if self.n else 0
+
+    def stdev(self):
+        return self.moments.stdev()
+
+    def quantile(self, q):
+        return self.histogram.quantile(q)
+
+
+class SketchInterveningDistance(InterveningDistance):
+    """4. Intervening Distance Analysis with Welford moments and histograms"""
+
+    def __init__(self):
+        self.distances = DistanceSketch()
+        self.same_marker = DistanceSketch()
+        self.diff_marker = DistanceSketch()
+
+    def report(self, analyzer):
+        super().report(analyzer)
+        if not self.distances.n:
+            return
+        print(f"\n(d) Distance quantiles (bucket bounds from a fixed histogram):")
+        for label, q in [("Median", 0.5), ("90th percentile", 0.9), ("99th percentile", 0.99)]:
+            low, high = self.distances.quantile(q)
+            if low == high:
+                print(f"    {label}: {low} (exact)")
+            else:
+                upper = "inf" if high is None else high
+                print(f"    {label}: in [{low}, {upper}]")
+
+
+# Major POS categories, defined strictly to avoid overlapping matches
+POS_CATEGORIES = {
+    'NN (Common Noun)': lambda x: x == 'NN' or x.startswith('NN:'),
+    'NNP (Proper Noun)': lambda x: x.startswith('NNP'), # Includes NNPC
+    'VM (Main Verb)': lambda x: x.startswith('VM'),
+    'JJ (Adjective)': lambda x: x.startswith('JJ'),
+    'PRP (Pronoun)': lambda x: x.startswith('PRP'),
+    'PSP (Postposition)': lambda x: x.startswith('PSP'),
+    'CC (Conjunction)': lambda x: x.startswith('CC'),
+}
+
+
+class PosTags(Analysis):
+    """5. POS Tag Distribution"""
+
+    def __init__(self):
+        self.pos_counts = Counter()
+        self.total = 0
+
+    def begin_store(self, view):
+        # Count fine-grained POS codes for this store, keyed back to strings at the end
+        self._pos_strings = view.store.vocab('pos_full').strings
+
+    def visit_sentence(self, view, start, end):
+        pos_full = view.pos_full
+        strings = self._pos_strings
+        for row in range(start, end):
+            self.pos_counts[strings[pos_full[row]]] += 1
+        self.total += end - start
+
+    def merge(self, other):
+        self.pos_counts.update(other.pos_counts)
+        self.total += other.total
+
+    def report(self, analyzer):
+        print("=" * 60)
+        print("5. POS TAG DISTRIBUTION")
+        print("=" * 60)
+
+        # Count only fine-grained POS tags
+        # To avoid double counting, we use exact matches or strict categorization [Task 5 Critical Fix]
+        pos_counts = self.pos_counts
+        total = self.total
+
+        category_counts = Counter()
+        print("(a) Major POS Categories:")
+        for cat_name, matcher in POS_CATEGORIES.items():
+            count = sum(c for tag, c in pos_counts.items() if matcher(tag))
+            print(f"    {cat_name}: {count} ({(count/total)*100:.2f}%)")
+            category_counts[cat_name] = count
+
+        # Verb to Noun Ratio
+        # Nouns = All Noun types (NN, NNP, NNC, etc.)
+        noun_count = sum(c for tag, c in pos_counts.items() if tag.startswith('NN'))
+        verb_count = sum(c for tag, c in pos_counts.items() if tag.startswith('VM'))
+
+        print(f"\n(b) Proportion of Verbs vs Nouns:")
+        print(f"    Total Nouns (All types): {noun_count}")
+        print(f"    Total Main Verbs (VM): {verb_count}")
+        if noun_count > 0:
+            print(f"    Verb-to-Noun Ratio: {verb_count/noun_count:.2f}")
+
+        # Save Plot
+        analyzer.plot_frequency_distribution(
+            category_counts,
+            "Major POS Category Distribution",
+            "plot_pos_distribution.png",
+            xlabel="POS Category"
+        )
+
+
+# Report sections in the order generate_report prints them
+DEFAULT_ANALYSES = (BasicStatistics, WordOrder, CaseMarkers, InterveningDistance, PosTags)
+
+# Opt-in bounded-memory variant: word types and distances are sketched
+SKETCH_ANALYSES = (SketchBasicStatistics, WordOrder, CaseMarkers, SketchInterveningDistance, PosTags)
+
+# Bump whenever the partial state of any analysis changes shape or meaning,
+# so persisted per-file partials from older code are not merged
+PARTIALS_VERSION = 1
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: memoized morph decoder vs per-token regex / split parsing
+Linguistic Data 3 - Assignment on Descriptive Analysis of Hindi Data
+
+Usage: python3 bench_morph.py [HDTB data dir] [--repeat N]
+"""
+
+import argparse
+import re
+import time
+from pathlib import Path
+
+from morph import parse_morph
+
+
+def load_feature_column(data_dir):
+    """FEATS column of every token line under data_dir, in file order"""
+    feats = []
+    for dat_file in sorted(Path(data_dir).rglob("*.dat")):
+        with open(dat_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.rstrip('\n').split('\t')
+                if len(parts) >= 8:
+                    feats.append(parts[5])
+    return feats
+
+
+def regex_case_vib(feats):
+    """Old analyzer path: two re.search calls per token"""
+    for morph_str in feats:
+        if not morph_str or morph_str == '_':
+            continue
+        re.search(r'case-([^|]+)', morph_str)
+        re.search(r'vib-([^|]+)', morph_str)
+
+
+def split_features(feats):
+    """Old part1 path: split every string by hand"""
+    for feats_str in feats:
+        if feats_str and feats_str != '_':
+            for feat in feats_str.split('|'):
+                if '-' in feat:
+                    k, v = feat.split('-', 1)
+
+
+def cached_decoder(feats):
+    """New path: one parse per distinct string, cache hits afterwards"""
+    parse_morph.cache_clear()
+    for morph_str in feats:
+        record = parse_morph(morph_str)
+        record.case
+        record.vib
+
+
+def best_of(fn, feats, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(feats)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    default_data_dir = "/home/vivek/python/LD3/Assignments/3/HDTB_pre_release_version-0.05/IntraChunk/CoNLL/wx"
+
+    parser = argparse.ArgumentParser(description="Benchmark the shared morph-feature decoder.")
+    parser.add_argument("data_dir", nargs="?", default=default_data_dir, help="Directory searched recursively for .dat files.")
+    parser.add_argument("--repeat", type=int, default=5, help="Report the best of N runs.")
+    args = parser.parse_args()
+
+    feats = load_feature_column(args.data_dir)
+    print(f"Tokens: {len(feats)}  distinct feature strings: {len(set(feats))}")
+
+    cached = best_of(cached_decoder, feats, args.repeat)
+    for name, fn in [("regex case+vib", regex_case_vib), ("manual split", split_features)]:
+        elapsed = best_of(fn, feats, args.repeat)
+        print(f"{name:16s} {elapsed * 1000:8.1f} ms   speedup of parse_morph: {elapsed / cached:.1f}x")
+    print(f"{'parse_morph':16s} {cached * 1000:8.1f} ms   {parse_morph.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Compact columnar token store for the Hindi Dependency Treebank
+Linguistic Data 3 - Assignment on Descriptive Analysis of Hindi Data
+"""
+
+import sys
+from array import array
+from collections import Counter
+
+# Column names for the string-valued CoNLL fields, each interned in its own Vocab
+STRING_COLUMNS = ('word', 'lemma', 'pos_short', 'pos_full', 'morph', 'deprel')
+
+
+class Vocab:
+    """Interning table mapping strings to dense integer codes and back"""
+
+    def __init__(self):
+        self.index = {}
+        self.strings = []
+
+    @classmethod
+    def from_strings(cls, strings):
+        """Rebuild a vocabulary whose code i is strings[i]"""
+        vocab = cls()
+        vocab.strings = list(strings)
+        vocab.index = {s: code for code, s in enumerate(vocab.strings)}
+        return vocab
+
+    def add(self, s):
+        """Return the code for s, assigning the next free code if it is new"""
+        code = self.index.get(s)
+        if code is None:
+            code = len(self.strings)
+            self.index[s] = code
+            self.strings.append(s)
+        return code
+
+    def get(self, s, default=-1):
+        """Return the code for s without interning it"""
+        return self.index.get(s, default)
+
+    def __getitem__(self, code):
+        return self.strings[code]
+
+    def __len__(self):
+        return len(self.strings)
+
+    def __contains__(self, s):
+        return s in self.index
+
+    def codes_where(self, predicate):
+        """Set of codes whose string satisfies predicate"""
+        return {code for code, s in enumerate(self.strings) if predicate(s)}
+
+
+class SentenceIndex:
+    """Dependency lookups for one sentence, built in a single pass over its rows
+
+    - position: token ID -> row (first row if an ID repeats)
+    - children: head ID -> rows of its dependents, in sentence order
+    - by_deprel: deprel code -> rows with that relation, in sentence order
+
+    Heads are keyed by ID rather than row, so dependents of a token that was
+    skipped at load time (e.g. punctuation) are still reachable.
+    """
+
+    __slots__ = ('start', 'end', 'position', 'children', 'by_deprel', '_heads', '_deprels')
+
+    _NONE = ()
+
+    def __init__(self, store, start, end):
+        ids = store.ids
+        heads = store.heads
+        deprels = store.columns['deprel']
+        position = {}
+        children = {}
+        by_deprel = {}
+        for row in range(start, end):
+            position.setdefault(ids[row], row)
+            rows = children.get(heads[row])
+            if rows is None:
+                children[heads[row]] = [row]
+            else:
+                rows.append(row)
+            rows = by_deprel.get(deprels[row])
+            if rows is None:
+                by_deprel[deprels[row]] = [row]
+            else:
+                rows.append(row)
+        self.start = start
+        self.end = end
+        self.position = position
+        self.children = children
+        self.by_deprel = by_deprel
+        self._heads = heads
+        self._deprels = deprels
+
+    def row_of(self, token_id):
+        """Row of the token with this ID, or None"""
+        return self.position.get(token_id)
+
+    def dependents(self, token_id):
+        """Rows whose head is token_id"""
+        return self.children.get(token_id, self._NONE)
+
+    def with_deprel(self, deprel_code):
+        """Rows whose relation has this code"""
+        return self.by_deprel.get(deprel_code, self._NONE)
+
+    def first_with_deprel(self, deprel_code, head=None):
+        """First row with this relation (and head ID, if given), or None"""
+        if head is None:
+            rows = self.by_deprel.get(deprel_code)
+            return rows[0] if rows else None
+        deprels = self._deprels
+        for row in self.children.get(head, self._NONE):
+            if deprels[row] == deprel_code:
+                return row
+        return None
+
+
+class TokenStore:
+    """Column-oriented, integer-encoded storage for a parsed CoNLL corpus
+
+    Every token is a row across parallel `array` columns: `ids` and `heads`
+    hold the CoNLL ID and HEAD fields, and one code column per entry in
+    STRING_COLUMNS holds indices into the matching Vocab. Sentence i spans
+    rows offsets[i]:offsets[i + 1].
+
+    Columns are normally growable arrays; stores loaded from the on-disk
+    cache hold read-only memoryviews over a memory-mapped file instead.
+    """
+
+    def __init__(self):
+        self.vocabs = {name: Vocab() for name in STRING_COLUMNS}
+        self.ids = array('i')
+        self.heads = array('i')
+        self.columns = {name: array('i') for name in STRING_COLUMNS}
+        self.offsets = array('q', [0])
+
+    @classmethod
+    def from_columns(cls, vocabs, ids, heads, columns, offsets):
+        """Wrap existing column buffers (arrays or memoryviews) without copying"""
+        store = cls.__new__(cls)
+        store.vocabs = vocabs
+        store.ids = ids
+        store.heads = heads
+        store.columns = columns
+        store.offsets = offsets
+        return store
+
+    def add_token(self, token_id, head, word, lemma, pos_short, pos_full, morph, deprel):
+        """Append one token row to the currently open sentence"""
+        self.ids.append(token_id)
+        self.heads.append(head)
+        values = (word, lemma, pos_short, pos_full, morph, deprel)
+        for name, value in zip(STRING_COLUMNS, values):
+            self.columns[name].append(self.vocabs[name].add(value))
+
+    def end_sentence(self):
+        """Close the open sentence; empty sentences are not recorded"""
+        if len(self.ids) > self.offsets[-1]:
+            self.offsets.append(len(self.ids))
+
+    def discard_open_sentence(self):
+        """Drop rows appended since the last end_sentence() call"""
+        start = self.offsets[-1]
+        for column in self._code_columns():
+            del column[start:]
+
+    def extend(self, other):
+        """Append all sentences of another store, remapping its codes into ours"""
+        self.discard_open_sentence()
+        base = self.num_tokens
+        self.ids.extend(other.ids[:other.num_tokens])
+        self.heads.extend(other.heads[:other.num_tokens])
+        for name in STRING_COLUMNS:
+            vocab = self.vocabs[name]
+            remap = [vocab.add(string) for string in other.vocabs[name].strings]
+            column = other.columns[name]
+            self.columns[name].extend(remap[column[row]] for row in range(other.num_tokens))
+        self.offsets.extend(base + offset for offset in other.offsets[1:])
+
+    def _code_columns(self):
+        return [self.ids, self.heads] + [self.columns[name] for name in STRING_COLUMNS]
+
+    @property
+    def num_tokens(self):
+        return self.offsets[-1]
+
+    @property
+    def num_sentences(self):
+        return len(self.offsets) - 1
+
+    def sentence_bounds(self):
+        """Yield (start, end) row ranges for every sentence"""
+        offsets = self.offsets
+        for i in range(len(offsets) - 1):
+            yield offsets[i], offsets[i + 1]
+
+    def sentence_lengths(self):
+        offsets = self.offsets
+        return [offsets[i + 1] - offsets[i] for i in range(len(offsets) - 1)]
+
+    def column(self, name):
+        """Code column for one of STRING_COLUMNS"""
+        return self.columns[name]
+
+    def vocab(self, name):
+        return self.vocabs[name]
+
+    def count(self, name):
+        """Counter of string -> frequency for one column"""
+        counts = [0] * len(self.vocabs[name])
+        for code in self.columns[name]:
+            counts[code] += 1
+        strings = self.vocabs[name].strings
+        return Counter({strings[code]: c for code, c in enumerate(counts) if c})
+
+    def token(self, row):
+        """Materialize one row as the legacy token dictionary"""
+        token = {'id': self.ids[row]}
+        for name in STRING_COLUMNS:
+            token[name] = self.vocabs[name][self.columns[name][row]]
+        token['parent_id'] = self.heads[row]
+        return token
+
+    def sentence(self, start, end):
+        return [self.token(row) for row in range(start, end)]
+
+    def sentence_index(self, start, end):
+        """SentenceIndex over rows start:end"""
+        return SentenceIndex(self, start, end)
+
+    def nbytes(self):
+        """Approximate memory held by columns and vocabularies"""
+        total = self.offsets.itemsize * len(self.offsets)
+        for column in self._code_columns():
+            total += column.itemsize * len(column)
+        for vocab in self.vocabs.values():
+            total += sum(sys.getsizeof(s) for s in vocab.strings)
+            total += sys.getsizeof(vocab.index) + sys.getsizeof(vocab.strings)
+        return total
+
+
+def parse_token_fields(line):
+    """Split a CoNLL token line into store fields, or None if invalid/punctuation"""
+    parts = line.split('\t')
+
+    if len(parts) < 8:
+        return None
+
+    try:
+        token_id = int(parts[0])
+    except ValueError:
+        return None
+
+    parent_id = int(parts[6]) if parts[6] != '_' else 0
+
+    # Skip punctuation for analysis
+    if parts[3] == 'SYM' or parts[4] == 'SYM':
+        return None
+
+    # (id, head, word, lemma, pos_short, pos_full, morph, deprel)
+    return (token_id, parent_id, parts[1], parts[2], parts[3], parts[4], parts[5], parts[7])
+
+
+def parse_conll_file(filepath, store):
+    """Parse a single CoNLL formatted file into store"""
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+
+                if not line:
+                    # Empty line marks end of sentence
+                    store.end_sentence()
+                    continue
+
+                try:
+                    fields = parse_token_fields(line)
+                except ValueError:
+                    continue
+                if fields:
+                    store.add_token(*fields)
+    except Exception:
+        store.discard_open_sentence()
+        raise
+    # Handle last sentence if file doesn't end with newline
+    store.end_sentence()
+
+
+def parse_file_job(filepath):
+    """Process-pool worker: parse one file into a fresh store
+
+    Returns (store, error) where error is None on success. On failure the
+    store holds the sentences completed before the error, as in a serial
+    parse into a shared store.
+    """
+    store = TokenStore()
+    try:
+        parse_conll_file(filepath, store)
+    except Exception as e:
+        return store, e
+    return store, None
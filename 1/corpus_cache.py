@@ -0,0 +1,233 @@
+"""
+Persistent on-disk cache of parsed CoNLL files
+Linguistic Data 3 - Hindi (HDTB) and Telugu treebank analyses
+
+Each parsed file is stored as one binary entry holding the TokenStore
+columns as raw native integers followed by the vocabularies. Entries are
+memory-mapped on load and the columns are exposed as memoryviews, so a
+warm run reads no text and copies no column data.
+
+A JSON index maps (parser variant, source path) to the size, mtime and
+BLAKE2 content hash recorded when the entry was built. A source whose size
+or mtime changed is re-hashed; if the content changed too it is re-parsed.
+Entries are named by variant and content hash and evicted least recently
+used first once the cache grows past its byte budget.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+import time
+from pathlib import Path
+
+from corpus import STRING_COLUMNS, TokenStore, Vocab
+
+FORMAT_VERSION = 1
+MAGIC = b'LD3C'
+# magic, version, byte order, token count, offsets count, then one
+# (string count, blob bytes) pair per string column
+HEADER = struct.Struct('<4sHHQQ' + 'QQ' * len(STRING_COLUMNS))
+INDEX_FILE = 'index.json'
+
+DEFAULT_CACHE_DIR = Path.home() / '.cache' / 'ld3-corpus'
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_BYTE_ORDER = 0 if sys.byteorder == 'little' else 1
+
+
+def content_hash(path):
+    """BLAKE2b digest of a file's bytes"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_store(store, path):
+    """Serialize a TokenStore to path in the cache entry format"""
+    n = store.num_tokens
+    columns = [store.ids, store.heads] + [store.columns[name] for name in STRING_COLUMNS]
+    blobs = ['\0'.join(store.vocabs[name].strings).encode('utf-8') for name in STRING_COLUMNS]
+    sizes = []
+    for name, blob in zip(STRING_COLUMNS, blobs):
+        sizes.extend((len(store.vocabs[name]), len(blob)))
+
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, _BYTE_ORDER, n, len(store.offsets), *sizes))
+        for column in columns:
+            f.write(memoryview(column)[:n].cast('B'))
+        f.write(memoryview(store.offsets).cast('B'))
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, path)
+
+
+def read_store(path):
+    """Memory-map a cache entry and wrap it as a read-only TokenStore
+
+    Raises ValueError if the entry is truncated or was written by an
+    incompatible version or platform.
+    """
+    with open(path, 'rb') as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(buf)
+    if len(view) < HEADER.size:
+        raise ValueError(f"truncated cache entry {path}")
+    magic, version, byte_order, n, n_offsets, *sizes = HEADER.unpack_from(view)
+    if magic != MAGIC or version != FORMAT_VERSION or byte_order != _BYTE_ORDER:
+        raise ValueError(f"incompatible cache entry {path}")
+    expected = HEADER.size + 4 * n * (2 + len(STRING_COLUMNS)) + 8 * n_offsets + sum(sizes[1::2])
+    if len(view) != expected:
+        raise ValueError(f"corrupt cache entry {path}")
+
+    pos = HEADER.size
+    int_columns = []
+    for _ in range(2 + len(STRING_COLUMNS)):
+        int_columns.append(view[pos:pos + 4 * n].cast('i'))
+        pos += 4 * n
+    offsets = view[pos:pos + 8 * n_offsets].cast('q')
+    pos += 8 * n_offsets
+
+    vocabs = {}
+    for i, name in enumerate(STRING_COLUMNS):
+        count, blob_size = sizes[2 * i], sizes[2 * i + 1]
+        strings = bytes(view[pos:pos + blob_size]).decode('utf-8').split('\0') if count else []
+        vocabs[name] = Vocab.from_strings(strings)
+        pos += blob_size
+
+    ids, heads, *codes = int_columns
+    return TokenStore.from_columns(vocabs, ids, heads, dict(zip(STRING_COLUMNS, codes)), offsets)
+
+
+class CorpusCache:
+    """Size-bounded cache of parsed files, shared across runs
+
+    variant names the parser that produced the stores (e.g. 'analysis'),
+    so different parsers of the same file get separate entries.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, variant='analysis', max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.variant = variant
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.cache_dir / INDEX_FILE, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('version') != FORMAT_VERSION:
+                raise ValueError
+        except (OSError, ValueError):
+            index = {'version': FORMAT_VERSION, 'files': {}, 'entries': {}}
+        self.files = index['files']
+        self.entries = index['entries']
+
+    def save(self):
+        """Evict down to the byte budget and write the index atomically"""
+        self._evict()
+        index = {'version': FORMAT_VERSION, 'files': self.files, 'entries': self.entries}
+        tmp_path = self.cache_dir / (INDEX_FILE + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.cache_dir / INDEX_FILE)
+
+    def _file_key(self, path):
+        return f"{self.variant}:{os.path.abspath(path)}"
+
+    # Entry file suffix and (de)serializers; subclasses may store other objects
+    suffix = '.bin'
+
+    def _read_entry(self, path):
+        return read_store(path)
+
+    def _write_entry(self, obj, path):
+        write_store(obj, path)
+
+    def _entry_name(self, digest):
+        return f"{self.variant}-{digest}{self.suffix}"
+
+    def _fingerprint(self, path):
+        """(size, mtime_ns, content hash) of path, hashing only if size/mtime moved"""
+        st = os.stat(path)
+        record = self.files.get(self._file_key(path))
+        if record and record['size'] == st.st_size and record['mtime_ns'] == st.st_mtime_ns:
+            return st.st_size, st.st_mtime_ns, record['digest']
+        return st.st_size, st.st_mtime_ns, content_hash(path)
+
+    def _record(self, path, size, mtime_ns, digest):
+        name = self._entry_name(digest)
+        self.files[self._file_key(path)] = {'size': size, 'mtime_ns': mtime_ns, 'digest': digest, 'entry': name}
+        return name
+
+    def __contains__(self, path):
+        """Whether an entry for path's current contents exists (entry not validated)"""
+        return self._entry_name(self._fingerprint(path)[2]) in self.entries
+
+    def get(self, path):
+        """Cached object for path, or None if missing, stale or corrupt"""
+        size, mtime_ns, digest = self._fingerprint(path)
+        name = self._entry_name(digest)
+        if name not in self.entries:
+            return None
+        try:
+            obj = self._read_entry(self.cache_dir / name)
+        except (OSError, ValueError):
+            self._drop_entry(name)
+            return None
+        self._record(path, size, mtime_ns, digest)
+        self.entries[name]['last_used'] = time.time()
+        return obj
+
+    def put(self, path, obj):
+        """Write obj as the entry for path's current contents"""
+        name = self._record(path, *self._fingerprint(path))
+        self._write_entry(obj, self.cache_dir / name)
+        self.entries[name] = {'bytes': (self.cache_dir / name).stat().st_size, 'last_used': time.time()}
+
+    def _drop_entry(self, name):
+        self.entries.pop(name, None)
+        try:
+            os.remove(self.cache_dir / name)
+        except OSError:
+            pass
+
+    def _evict(self):
+        total = sum(entry['bytes'] for entry in self.entries.values())
+        for name in sorted(self.entries, key=lambda k: self.entries[k]['last_used']):
+            if total <= self.max_bytes:
+                break
+            total -= self.entries[name]['bytes']
+            self._drop_entry(name)
+        self.files = {key: record for key, record in self.files.items()
+                      if record['entry'] in self.entries}
+
+
+class PartialCache(CorpusCache):
+    """Cache of per-file partial analysis results, stored as pickles
+
+    Shares the fingerprinting, index and eviction of CorpusCache; the variant
+    should change whenever the analyses' partial state changes shape.
+    """
+
+    suffix = '.pkl'
+
+    def _read_entry(self, path):
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            raise ValueError(f"corrupt cache entry {path}") from e
+
+    def _write_entry(self, obj, path):
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
@@ -0,0 +1,66 @@
+"""
+Shared decoder for IIIT-style morphological feature strings
+Linguistic Data 3 - Hindi (HDTB) and Telugu treebank analyses
+
+The FEATS column holds strings such as
+    cat-n|gen-m|num-sg|pers-3|case-o|vib-0_ne|tam-0|chunkId-NP|stype-|voicetype-
+A corpus has only a few thousand distinct strings against hundreds of
+thousands of tokens, so each distinct string is parsed once and the
+immutable record is served from a bounded LRU cache afterwards.
+"""
+
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+# Upper bound on cached distinct feature strings (HDTB has ~12k)
+CACHE_SIZE = 1 << 16
+
+
+class MorphFeatures(NamedTuple):
+    """Decoded feature string; a key is None if absent, '' if present but empty"""
+    cat: Optional[str] = None
+    gen: Optional[str] = None
+    num: Optional[str] = None
+    pers: Optional[str] = None
+    case: Optional[str] = None
+    vib: Optional[str] = None
+    tam: Optional[str] = None
+    chunkId: Optional[str] = None
+    chunkType: Optional[str] = None
+    stype: Optional[str] = None
+    voicetype: Optional[str] = None
+    # Any key not listed above, as (key, value) pairs in input order
+    other: Tuple[Tuple[str, str], ...] = ()
+
+    def get(self, key, default=None):
+        """Look up a feature by name, including keys kept in `other`"""
+        if key in _FIELDS:
+            value = getattr(self, key)
+        else:
+            value = next((v for k, v in self.other if k == key), None)
+        return default if value is None else value
+
+
+_FIELDS = frozenset(MorphFeatures._fields) - {'other'}
+
+EMPTY = MorphFeatures()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_morph(morph_str):
+    """Decode a `key-value|key-value|...` feature string into MorphFeatures"""
+    if not morph_str or morph_str == '_':
+        return EMPTY
+
+    values = {}
+    other = []
+    for feat in morph_str.split('|'):
+        key, sep, value = feat.partition('-')
+        if not sep:
+            continue
+        if key in _FIELDS:
+            # Keep the first occurrence of a repeated key
+            values.setdefault(key, value)
+        else:
+            other.append((key, value))
+    return MorphFeatures(other=tuple(other), **values)
@@ -0,0 +1,61 @@
+"""
+Background plot rendering for the treebank analyses
+Linguistic Data 3 - Assignment on Descriptive Analysis of Hindi Data
+
+matplotlib is imported only inside the worker process, with the Agg
+backend, so neither startup nor the analysis itself waits for it.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+
+def render_bar_chart(labels, values, title, filename, xlabel, ylabel):
+    """Render one bar chart to filename (runs in the plotting process)"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(12, 6))
+    plt.bar(labels, values, color='skyblue', edgecolor='black')
+    plt.title(title)
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    plt.xticks(rotation=45, ha='right')
+    plt.grid(axis='y', linestyle='--', alpha=0.7)
+    plt.tight_layout()
+    plt.savefig(filename)
+    plt.close()
+    return filename
+
+
+class PlotQueue:
+    """Fire-and-forget plot jobs on a lazily started process pool
+
+    With enabled=False every submission is dropped, which is the --no-plots
+    fast path.
+    """
+
+    def __init__(self, enabled=True, workers=1):
+        self.enabled = enabled
+        self.workers = workers
+        self._pool = None
+        self._pending = []
+
+    def submit(self, fn, *args):
+        if not self.enabled:
+            return
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._pending.append(self._pool.submit(fn, *args))
+
+    def wait(self):
+        """Block until submitted plots are written, reporting any failures"""
+        for future in self._pending:
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Error rendering plot: {e}")
+        self._pending = []
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Indexed dependency-pattern queries over the Hindi Dependency Treebank
+Linguistic Data 3 - Assignment on Descriptive Analysis of Hindi Data
+
+A CorpusIndex keeps, for a loaded TokenStore, sorted postings (token rows)
+for every value of the word, lemma, POS, deprel, vibhakti and case fields,
+plus the row of each token's head and a CSR table of each token's
+dependents. A Query describes one token by field values and optional
+constraints on its head, dependents and siblings; it is answered by
+intersecting postings rather than scanning sentences.
+
+Query syntax (command line and Query.parse):
+
+    node  := term* [head(node)] [child(node)]* [after(node)] [before(node)]
+    term  := field=value[|value...]     (a value ending in * is a prefix)
+    field := word lemma cpos pos deprel vib case
+
+- head(q): the token's head matches q
+- child(q): some dependent of the token matches q (repeatable)
+- after(q) / before(q): a sibling (same head) matching q precedes / follows it
+
+Examples:
+    deprel=k2 vib=0_ko head(pos=VM)     k2 dependents marked ko of a VM head
+    deprel=k1 after(deprel=k2)          k1 after a k2 of the same head
+"""
+
+import argparse
+import re
+import time
+from array import array
+from bisect import bisect_left
+
+from analysis import TreebankAnalyzer
+from corpus_cache import DEFAULT_CACHE_DIR, CorpusCache
+
+# Query field -> store column; vib and case are decoded from the morph column
+COLUMN_FIELDS = {'word': 'word', 'lemma': 'lemma', 'cpos': 'pos_short', 'pos': 'pos_full', 'deprel': 'deprel'}
+MORPH_FIELDS = ('vib', 'case')
+FIELDS = tuple(COLUMN_FIELDS) + MORPH_FIELDS
+
+
+def intersect(a, b):
+    """Rows present in both sorted sequences"""
+    if len(a) > len(b):
+        a, b = b, a
+    result = []
+    lo = 0
+    n = len(b)
+    # Walk the shorter list, binary-searching the longer one from the last hit
+    for x in a:
+        lo = bisect_left(b, x, lo)
+        if lo == n:
+            break
+        if b[lo] == x:
+            result.append(x)
+    return result
+
+
+def union(postings):
+    """Rows present in any of the sorted sequences, sorted"""
+    if len(postings) == 1:
+        return postings[0]
+    return sorted(set().union(*postings))
+
+
+class Query:
+    """Pattern for one token; see the module docstring for the syntax"""
+
+    def __init__(self, head=None, children=(), after=None, before=None, **terms):
+        for field in terms:
+            if field not in FIELDS:
+                raise ValueError(f"unknown field '{field}' (expected one of: {' '.join(FIELDS)})")
+        # field -> accepted values; 'a|b' and ('a', 'b') are equivalent
+        self.terms = {field: tuple(values.split('|')) if isinstance(values, str) else tuple(values)
+                      for field, values in terms.items()}
+        self.head = head
+        self.children = list(children)
+        self.after = after
+        self.before = before
+
+    def __repr__(self):
+        parts = [f"{field}={'|'.join(values)}" for field, values in self.terms.items()]
+        if self.head is not None:
+            parts.append(f"head({self.head!r})")
+        parts.extend(f"child({child!r})" for child in self.children)
+        if self.after is not None:
+            parts.append(f"after({self.after!r})")
+        if self.before is not None:
+            parts.append(f"before({self.before!r})")
+        return ' '.join(parts)
+
+    _TOKEN = re.compile(r'\s*(?:(head|child|after|before)\(|(\))|([^\s()=]+)=([^\s()]+))')
+
+    @classmethod
+    def parse(cls, text):
+        """Build a Query from the textual syntax; raises ValueError"""
+        query, pos = cls._parse_node(text, 0)
+        if text[pos:].strip():
+            raise ValueError(f"unexpected input at position {pos}: {text[pos:].strip()!r}")
+        return query
+
+    @classmethod
+    def _parse_node(cls, text, pos):
+        terms = {}
+        constraints = {'children': []}
+        while True:
+            m = cls._TOKEN.match(text, pos)
+            if m is None or m.group(2):
+                return cls(**constraints, **terms), pos
+            pos = m.end()
+            kind = m.group(1)
+            if kind is None:
+                terms[m.group(3)] = m.group(4)
+                continue
+            sub, pos = cls._parse_node(text, pos)
+            close = cls._TOKEN.match(text, pos)
+            if close is None or not close.group(2):
+                raise ValueError(f"missing ')' after {kind}( at position {pos}")
+            pos = close.end()
+            if kind == 'child':
+                constraints['children'].append(sub)
+            elif kind in constraints:
+                raise ValueError(f"{kind}(...) given more than once")
+            else:
+                constraints[kind] = sub
+
+
+class CorpusIndex:
+    """Inverted indexes and head/dependent tables over a TokenStore
+
+    get_vibhakti and get_case_from_morph decode a morph string, as the
+    TreebankAnalyzer methods of the same name.
+    """
+
+    def __init__(self, store, get_vibhakti, get_case_from_morph):
+        self.store = store
+        n = store.num_tokens
+
+        # field -> {value: array of rows}; rows are appended in order, so sorted
+        self.postings = {}
+        for field, column in COLUMN_FIELDS.items():
+            self.postings[field] = self._column_postings(store.vocab(column).strings, store.column(column), n)
+        morphs = store.vocab('morph').strings
+        self.postings['vib'] = self._column_postings([get_vibhakti(m) for m in morphs], store.column('morph'), n)
+        self.postings['case'] = self._column_postings([get_case_from_morph(m) for m in morphs],
+                                                      store.column('morph'), n)
+
+        # head_row[r]: row of r's head, -1 for the root or a head skipped at load time
+        # sentence_of[r]: sentence number of row r
+        self.head_row = array('i', [-1]) * n
+        self.sentence_of = array('i', [0]) * n
+        for sent, (start, end) in enumerate(store.sentence_bounds()):
+            index = store.sentence_index(start, end)
+            for row in range(start, end):
+                self.sentence_of[row] = sent
+                head = index.row_of(store.heads[row])
+                if head is not None:
+                    self.head_row[row] = head
+
+        # CSR dependents: rows child_rows[child_start[h]:child_start[h + 1]] have head row h
+        counts = array('i', [0]) * (n + 1)
+        for head in self.head_row:
+            if head >= 0:
+                counts[head + 1] += 1
+        for h in range(n):
+            counts[h + 1] += counts[h]
+        self.child_start = counts
+        self.child_rows = array('i', [0]) * counts[n]
+        fill = array('i', counts[:n])
+        for row, head in enumerate(self.head_row):
+            if head >= 0:
+                self.child_rows[fill[head]] = row
+                fill[head] += 1
+
+    @staticmethod
+    def _column_postings(value_of_code, codes, n):
+        # Several codes may share a value (e.g. morph strings with the same vib),
+        # so rows are bucketed by value; None values are not indexed
+        postings = {}
+        bucket_of_code = []
+        for value in value_of_code:
+            if value is None:
+                bucket_of_code.append(None)
+            else:
+                bucket_of_code.append(postings.setdefault(value, array('i')))
+        for row in range(n):
+            bucket = bucket_of_code[codes[row]]
+            if bucket is not None:
+                bucket.append(row)
+        return {value: rows for value, rows in postings.items() if rows}
+
+    def values(self, field):
+        """Distinct values of a field with their token counts, most frequent first"""
+        postings = self.postings[field]
+        return sorted(((v, len(rows)) for v, rows in postings.items()), key=lambda x: -x[1])
+
+    def _term_rows(self, field, values):
+        postings = self.postings[field]
+        matched = []
+        for value in values:
+            if value.endswith('*'):
+                prefix = value[:-1]
+                matched.extend(rows for v, rows in postings.items() if v.startswith(prefix))
+            elif value in postings:
+                matched.append(postings[value])
+        return union(matched) if matched else []
+
+    def dependents(self, row):
+        """Rows whose head is row"""
+        return self.child_rows[self.child_start[row]:self.child_start[row + 1]]
+
+    def find(self, query):
+        """Sorted rows of all tokens matching query"""
+        # Own terms: intersect postings, smallest first
+        term_rows = sorted((self._term_rows(f, v) for f, v in query.terms.items()), key=len)
+        if term_rows:
+            rows = term_rows[0]
+            for other in term_rows[1:]:
+                rows = intersect(rows, other)
+        else:
+            rows = range(self.store.num_tokens)
+
+        if query.head is not None and rows:
+            heads = self.find(query.head)
+            if len(rows) <= len(heads):
+                heads = set(heads)
+                head_row = self.head_row
+                rows = [r for r in rows if head_row[r] in heads]
+            else:
+                # Fewer matching heads: expand their dependents and intersect
+                dependents = sorted(r for h in heads for r in self.dependents(h))
+                rows = intersect(rows, dependents)
+
+        for child in query.children:
+            if not rows:
+                break
+            head_row = self.head_row
+            with_child = sorted({head_row[r] for r in self.find(child) if head_row[r] >= 0})
+            rows = intersect(rows, with_child)
+
+        if query.after is not None and rows:
+            first = self._first_by_parent(self.find(query.after))
+            rows = [r for r in rows if first.get(self._parent_key(r), r) < r]
+        if query.before is not None and rows:
+            last = self._last_by_parent(self.find(query.before))
+            rows = [r for r in rows if last.get(self._parent_key(r), r) > r]
+        return list(rows)
+
+    def _parent_key(self, row):
+        # Siblings share a head row; root-level tokens share their sentence
+        head = self.head_row[row]
+        return head if head >= 0 else -1 - self.sentence_of[row]
+
+    def _first_by_parent(self, rows):
+        first = {}
+        for r in rows:
+            first.setdefault(self._parent_key(r), r)
+        return first
+
+    def _last_by_parent(self, rows):
+        return {self._parent_key(r): r for r in rows}
+
+    def sentences(self, rows):
+        """Sorted sentence numbers containing any of rows"""
+        sentence_of = self.sentence_of
+        return sorted({sentence_of[r] for r in rows})
+
+    def describe(self, row):
+        """One-line description of a matched token and its head"""
+        store = self.store
+        token = store.token(row)
+        sent = self.sentence_of[row]
+        head = self.head_row[row]
+        head_word = store.token(head)['word'] if head >= 0 else 'ROOT'
+        return (f"sent {sent + 1} tok {token['id']}: {token['word']}/{token['lemma']}/{token['pos_full']} "
+                f"--{token['deprel']}--> {head_word}")
+
+    def sentence_text(self, sent):
+        start, end = self.store.offsets[sent], self.store.offsets[sent + 1]
+        words = self.store.vocab('word')
+        column = self.store.column('word')
+        return ' '.join(words[column[row]] for row in range(start, end))
+
+
+def main():
+    default_data_dir = "/home/vivek/python/LD3/Assignments/1/HDTB_pre_release_version-0.05"
+
+    parser = argparse.ArgumentParser(description="Query the Hindi Dependency Treebank by dependency pattern.",
+                                     epilog="Example: %(prog)s 'deprel=k2 vib=0_ko head(pos=VM)'")
+    parser.add_argument("query", nargs="+", help="Query pattern(s), e.g. 'deprel=k1 after(deprel=k2)'.")
+    parser.add_argument("--data-dir", default=default_data_dir, help="Path to the HDTB data directory.")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Directory of the parsed-corpus cache.")
+    parser.add_argument("--no-cache", action="store_true", help="Always parse the text files.")
+    parser.add_argument("--sentences", action="store_true", help="Print matching sentences instead of tokens.")
+    parser.add_argument("--limit", type=int, default=20, help="Print at most N results per query (0: all).")
+    parser.add_argument("--count", action="store_true", help="Only print the number of matches.")
+    args = parser.parse_args()
+
+    try:
+        queries = [Query.parse(text) for text in args.query]
+    except ValueError as e:
+        parser.error(str(e))
+
+    cache = None if args.no_cache else CorpusCache(args.cache_dir, variant="analysis")
+    analyzer = TreebankAnalyzer(args.data_dir, cache=cache, plots=False)
+    analyzer.load_data()
+
+    started = time.perf_counter()
+    index = CorpusIndex(analyzer.corpus, analyzer.get_vibhakti, analyzer.get_case_from_morph)
+    print(f"Indexed {analyzer.corpus.num_tokens} tokens in {time.perf_counter() - started:.2f} s")
+
+    for query in queries:
+        print()
+        started = time.perf_counter()
+        rows = index.find(query)
+        sentences = index.sentences(rows)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"{query!r}: {len(rows)} tokens in {len(sentences)} sentences ({elapsed:.1f} ms)")
+        if args.count:
+            continue
+        results = sentences if args.sentences else rows
+        shown = results if args.limit <= 0 else results[:args.limit]
+        for item in shown:
+            if args.sentences:
+                print(f"  sent {item + 1}: {index.sentence_text(item)}")
+            else:
+                print(f"  {index.describe(item)}")
+        if len(shown) < len(results):
+            print(f"  ... {len(results) - len(shown)} more")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Constant-memory, mergeable summaries for streaming corpus statistics
+Linguistic Data 3 - Assignment on Descriptive Analysis of Hindi Data
+
+- HyperLogLog: approximate distinct count (word types)
+- Welford: running mean and variance
+- FixedHistogram: counts in a fixed set of integer buckets, for quantiles
+
+All three merge with another instance of the same configuration, so they
+can be built per file and combined like the exact accumulators.
+"""
+
+import hashlib
+import math
+
+
+def hash64(s):
+    """Stable 64-bit hash of a string (unlike hash(), not salted per process)"""
+    return int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class HyperLogLog:
+    """HyperLogLog distinct-count sketch with 2**p one-byte registers"""
+
+    def __init__(self, p=12):
+        self.p = p
+        self.m = 1 << p
+        self.registers = bytearray(self.m)
+
+    def add(self, s):
+        x = hash64(s)
+        index = x & (self.m - 1)
+        w = x >> self.p
+        # Rank = position of the leftmost 1-bit in the remaining 64 - p bits
+        rank = (64 - self.p) - w.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, strings):
+        for s in strings:
+            self.add(s)
+
+    def __ior__(self, other):
+        if other.p != self.p:
+            raise ValueError("cannot merge HyperLogLog sketches of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def estimate(self):
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            # Small-range correction: linear counting
+            return m * math.log(m / zeros)
+        return raw
+
+    def __len__(self):
+        return int(round(self.estimate()))
+
+    def relative_error(self):
+        """Standard error of the estimate, relative to the true count"""
+        return 1.04 / math.sqrt(self.m)
+
+
+class Welford:
+    """Running count, mean and sum of squared deviations (Welford/Chan)"""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def merge(self, other):
+        if not other.n:
+            return
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+
+    def variance(self):
+        """Sample variance"""
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    def stdev(self):
+        return math.sqrt(self.variance())
+
+
+class FixedHistogram:
+    """Counts of non-negative integers in fixed buckets
+
+    Values below `exact` get one bucket each; larger values fall into
+    power-of-two buckets [2**k, 2**(k+1)) up to 2**max_log2, and anything
+    beyond lands in a final overflow bucket.
+    """
+
+    def __init__(self, exact=32, max_log2=20):
+        self.exact = exact
+        self.max_log2 = max_log2
+        self.first_log2 = exact.bit_length()
+        self.counts = [0] * (exact + max_log2 - self.first_log2 + 2)
+        self.n = 0
+
+    def _bucket(self, x):
+        if x < self.exact:
+            return x
+        k = x.bit_length() - 1
+        if k >= self.max_log2:
+            return len(self.counts) - 1
+        return self.exact + max(k, self.first_log2 - 1) - (self.first_log2 - 1)
+
+    def bounds(self, bucket):
+        """Inclusive (low, high) values of a bucket; high is None for overflow"""
+        if bucket < self.exact:
+            return bucket, bucket
+        if bucket == len(self.counts) - 1:
+            return 1 << self.max_log2, None
+        k = bucket - self.exact + self.first_log2 - 1
+        low = max(1 << k, self.exact)
+        return low, (1 << (k + 1)) - 1
+
+    def add(self, x):
+        self.counts[self._bucket(x)] += 1
+        self.n += 1
+
+    def merge(self, other):
+        if len(other.counts) != len(self.counts) or other.exact != self.exact:
+            raise ValueError("cannot merge histograms with different buckets")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.n += other.n
+
+    def quantile(self, q):
+        """(low, high) bounds of the bucket holding the q-quantile"""
+        if not self.n:
+            return None
+        rank = max(1, math.ceil(q * self.n))
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.bounds(bucket)
+        return self.bounds(len(self.counts) - 1)
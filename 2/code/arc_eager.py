@@ -1,58 +1,164 @@
+from configuration import Configuration
+
 SH = 0
 RE = 1
 RA = 2
 LA = 3
+ACTION_NAMES = {SH: "SH", RE: "RE", RA: "RA", LA: "LA"}
+# Bump when the oracle's transitions change; keys cached sequences (transition_cache.py)
+VERSION = 1
 
 
 def has_head(node, arcs):
     return any(d == node for (_, d, _) in arcs)
 
 
-def transition(trans, stack, buffer, arcs):
-    """Apply one arc-eager transition.
+def apply(trans, config):
+    """Apply one arc-eager transition to a Configuration in O(1).
 
-    Configuration representation follows the assignment/starter code:
-    - stack: list[int] where stack[0] is TOP
-    - buffer: list[int] where buffer[0] is NEXT
-    - arcs: list[tuple[int,int,str]]
+    Returns False (and leaves config unchanged) if the transition is not
+    applicable, e.g. SH/RA/LA on an empty buffer.
     """
     action, label = trans
     if action == SH:
-        if not buffer:
-            return stack, buffer, arcs
-        stack.insert(0, buffer.pop(0))
-        return stack, buffer, arcs
+        if config.buffer_empty:
+            return False
+        config.shift()
+        return True
 
     if action == RE:
-        if stack:
-            stack.pop(0)
-        return stack, buffer, arcs
+        if not config.stack:
+            return False
+        config.pop()
+        return True
 
     if action == RA:
-        if not stack or not buffer:
-            return stack, buffer, arcs
-        head = stack[0]
-        dep = buffer[0]
-        arcs.append((head, dep, label))
-        stack.insert(0, buffer.pop(0))
-        return stack, buffer, arcs
+        if not config.stack or config.buffer_empty:
+            return False
+        config.add_arc(config.top, config.next, label)
+        config.shift()
+        return True
 
     if action == LA:
-        if not stack or not buffer:
-            return stack, buffer, arcs
-        dep = stack[0]
-        head = buffer[0]
-        arcs.append((head, dep, label))
-        stack.pop(0)
-        return stack, buffer, arcs
+        if not config.stack or config.buffer_empty:
+            return False
+        config.add_arc(config.next, config.top, label)
+        config.pop()
+        return True
 
     raise ValueError(f"Unknown transition action: {action}")
 
 
+def successor(trans, state):
+    """Like apply(), but for a persistent beam.State: returns the new state.
+
+    state is left unchanged; returns None if the transition is not applicable.
+    """
+    action, label = trans
+    if action == SH:
+        return None if state.buffer_empty else state.shift()
+    if action == RE:
+        return state.pop() if state.stack else None
+    if not state.stack or state.buffer_empty:
+        return None
+    if action == RA:
+        return state.add_arc(state.top, state.next, label).shift()
+    if action == LA:
+        return state.add_arc(state.next, state.top, label).pop()
+    raise ValueError(f"Unknown transition action: {action}")
+
+
+def is_terminal(config):
+    """Arc-eager stops once the buffer is empty."""
+    return config.buffer_empty
+
+
+def legal_actions(config):
+    """Actions that keep the parse well-formed (used by learned parsers)."""
+    if config.buffer_empty:
+        return []
+    actions = [SH]
+    if config.stack:
+        s0 = config.top
+        if config.has_head(s0):
+            actions.append(RE)
+        elif s0 != 0:
+            actions.append(LA)
+        actions.append(RA)
+    return actions
+
+
+def arc(action, config):
+    """(head, dependent) of the arc an action would add, or None."""
+    if action == LA:
+        return config.next, config.top
+    if action == RA:
+        return config.top, config.next
+    return None
+
+
+def transition(trans, stack, buffer, arcs):
+    """Apply one arc-eager transition.
+
+    Configuration representation follows the assignment/starter code:
+    - stack: list[int] where stack[0] is TOP
+    - buffer: list[int] where buffer[0] is NEXT
+    - arcs: list[tuple[int,int,str]]
+
+    Compatibility wrapper around apply(); converting the lists costs O(n)
+    per call, so parsers should keep a Configuration instead.
+    """
+    config = Configuration.from_lists(stack, buffer, arcs)
+    if apply(trans, config):
+        config.write_back(stack, buffer, arcs)
+    return stack, buffer, arcs
+
+
+class Oracle:
+    """Static oracle for arc-eager over a Configuration, O(1) per decision.
+
+    The buffer holds the remaining tokens in sentence order, so TOP has a
+    gold dependent left in the buffer iff its rightmost gold dependent is
+    at or after NEXT.
+    """
+
+    def __init__(self, gold_heads, gold_labels):
+        self.gold_heads = gold_heads
+        self.gold_labels = gold_labels
+        n = len(gold_heads)
+        self.last_dependent = [-1] * n
+        for k in range(1, n):
+            h = gold_heads[k]
+            if 0 <= h < n:
+                self.last_dependent[h] = k
+
+    def __call__(self, config):
+        if config.buffer_empty:
+            return (RE, "_")
+        if not config.stack:
+            return (SH, "_")
+
+        gold_heads = self.gold_heads
+        i = config.top  # TOP
+        j = config.next  # NEXT
+
+        if i != 0 and gold_heads[i] == j and not config.has_head(i):
+            return (LA, self.gold_labels[i])
+
+        if gold_heads[j] == i and not config.has_head(j):
+            return (RA, self.gold_labels[j])
+
+        if i != 0 and config.has_head(i) and self.last_dependent[i] < j:
+            return (RE, "_")
+
+        return (SH, "_")
+
+
 def oracle(stack, buffer, gold_heads, gold_labels, arcs):
     """Static oracle for arc-eager (Goldberg & Nivre, 2012; Algorithm 1).
 
     Returns a (action, label) pair where label is '_' for SH/RE.
+    List-representation version; see Oracle for the O(1) one.
     """
     if not buffer:
         return (RE, "_")
@@ -1,49 +1,180 @@
+from collections import Counter
+
+from configuration import Configuration
+
 SH = 0
 LA = 1
 RA = 2
+ACTION_NAMES = {SH: "SH", LA: "LA", RA: "RA"}
+# Bump when the oracle's transitions change; keys cached sequences (transition_cache.py)
+VERSION = 1
 
 
 def has_head(node, arcs):
     return any(d == node for (_, d, _) in arcs)
 
 
-def transition(trans, stack, buffer, arcs):
-    """Apply one arc-standard transition.
+def apply(trans, config):
+    """Apply one arc-standard transition to a Configuration in O(1).
 
-    Representation matches the starter code conventions:
-    - stack[0] is top
-    - buffer[0] is next
+    Returns False (and leaves config unchanged) if the transition is not
+    applicable, e.g. LA/RA with fewer than two items on the stack.
     """
     action, label = trans
     if action == SH:
-        if not buffer:
-            return stack, buffer, arcs
-        stack.insert(0, buffer.pop(0))
-        return stack, buffer, arcs
+        if config.buffer_empty:
+            return False
+        config.shift()
+        return True
 
     if action == LA:
         # Add (s1 -> s0) and pop s0
-        if len(stack) < 2:
-            return stack, buffer, arcs
-        s0 = stack[0]
-        s1 = stack[1]
-        arcs.append((s1, s0, label))
-        stack.pop(0)
-        return stack, buffer, arcs
+        if len(config.stack) < 2:
+            return False
+        config.add_arc(config.second, config.top, label)
+        config.pop()
+        return True
 
     if action == RA:
         # Add (s0 -> s1) and pop s1 (i.e., remove the second item)
-        if len(stack) < 2:
-            return stack, buffer, arcs
-        s0 = stack[0]
-        s1 = stack[1]
-        arcs.append((s0, s1, label))
-        stack.pop(1)
-        return stack, buffer, arcs
+        if len(config.stack) < 2:
+            return False
+        config.add_arc(config.top, config.second, label)
+        config.pop_second()
+        return True
+
+    raise ValueError(f"Unknown transition action: {action}")
+
 
+def successor(trans, state):
+    """Like apply(), but for a persistent beam.State: returns the new state.
+
+    state is left unchanged; returns None if the transition is not applicable.
+    """
+    action, label = trans
+    if action == SH:
+        return None if state.buffer_empty else state.shift()
+    if len(state.stack) < 2:
+        return None
+    if action == LA:
+        return state.add_arc(state.second, state.top, label).pop()
+    if action == RA:
+        return state.add_arc(state.top, state.second, label).pop_second()
     raise ValueError(f"Unknown transition action: {action}")
 
 
+def is_terminal(config):
+    """Arc-standard stops once the buffer is empty and only ROOT is left."""
+    return config.buffer_empty and len(config.stack) <= 1
+
+
+def legal_actions(config):
+    """Actions that keep the parse well-formed (used by learned parsers)."""
+    actions = []
+    if not config.buffer_empty:
+        actions.append(SH)
+    if len(config.stack) >= 2:
+        actions.append(LA)
+        if config.second != 0:
+            actions.append(RA)
+    return actions
+
+
+def arc(action, config):
+    """(head, dependent) of the arc an action would add, or None."""
+    if action == LA:
+        return config.second, config.top
+    if action == RA:
+        return config.top, config.second
+    return None
+
+
+def transition(trans, stack, buffer, arcs):
+    """Apply one arc-standard transition.
+
+    Representation matches the starter code conventions:
+    - stack[0] is top
+    - buffer[0] is next
+
+    Compatibility wrapper around apply(); converting the lists costs O(n)
+    per call, so parsers should keep a Configuration instead.
+    """
+    config = Configuration.from_lists(stack, buffer, arcs)
+    if apply(trans, config):
+        config.write_back(stack, buffer, arcs)
+    return stack, buffer, arcs
+
+
+class Oracle:
+    """Static oracle for arc-standard over a Configuration, O(1) per decision.
+
+    Same decisions as oracle(). Every arc-standard arc removes its dependent
+    from the configuration, so pending[x] (the number of gold dependents of
+    x not yet removed) is kept by decrementing it for each new arc.
+    """
+
+    def __init__(self, gold_heads, gold_labels):
+        self.gold_heads = gold_heads
+        self.gold_labels = gold_labels
+        n = len(gold_heads)
+        self.pending = [0] * n
+        for k in range(1, n):
+            h = gold_heads[k]
+            if 0 <= h < n:
+                self.pending[h] += 1
+        self.seen_arcs = 0
+        # Times each buffer-empty fallback fired (see profiling.Profile)
+        self.fallbacks = Counter()
+
+    def _sync(self, config):
+        # Account for arcs added since the last decision
+        arcs = config.arcs
+        gold_heads = self.gold_heads
+        pending = self.pending
+        n = len(pending)
+        for i in range(self.seen_arcs, len(arcs)):
+            h = gold_heads[arcs[i][1]]
+            if 0 <= h < n:
+                pending[h] -= 1
+        self.seen_arcs = len(arcs)
+
+    def has_unprocessed_gold_dependents(self, config, x):
+        # Gold dependents of x still on the stack (below TOP) or in the buffer
+        remaining = self.pending[x]
+        if self.gold_heads[config.top] == x:
+            remaining -= 1
+        return remaining > 0
+
+    def __call__(self, config):
+        self._sync(config)
+        if len(config.stack) < 2:
+            return (SH, "_")
+        gold_heads = self.gold_heads
+        gold_labels = self.gold_labels
+        s0 = config.top
+        s1 = config.second
+
+        if s0 != 0 and gold_heads[s0] == s1 and not self.has_unprocessed_gold_dependents(config, s0):
+            return (LA, gold_labels[s0])
+
+        if s1 != 0 and gold_heads[s1] == s0 and not self.has_unprocessed_gold_dependents(config, s1):
+            return (RA, gold_labels[s1])
+
+        if not config.buffer_empty:
+            return (SH, "_")
+
+        # Buffer empty but no oracle condition matched (typically non-projective / inconsistent).
+        # Fall back to a deterministic action to guarantee termination.
+        if s1 != 0 and not config.has_head(s1):
+            self.fallbacks["RA"] += 1
+            return (RA, gold_labels[s1])
+        if s0 != 0 and not config.has_head(s0):
+            self.fallbacks["LA"] += 1
+            return (LA, gold_labels[s0])
+        self.fallbacks["RA-dep"] += 1
+        return (RA, "dep")
+
+
 def oracle(stack, buffer, gold_heads, gold_labels, arcs):
     """Static oracle for arc-standard.
 
@@ -51,6 +182,8 @@ def oracle(stack, buffer, gold_heads, gold_labels, arcs):
     - LEFT-ARC when gold_head[s0] == s1 and all gold dependents of s0 are already attached.
     - RIGHT-ARC when gold_head[s1] == s0 and all gold dependents of s1 are already attached.
     Else SHIFT.
+
+    List-representation version; see Oracle for the Configuration one.
     """
     if len(stack) < 2:
         return (SH, "_")
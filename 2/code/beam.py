@@ -0,0 +1,251 @@
+import heapq
+import math
+from operator import itemgetter
+
+from configuration import Configuration
+
+
+class StackNode:
+    """One cell of a persistent linked stack.
+
+    A node is never modified once built: pushing makes a new node whose
+    `below` is the old stack, and changing an item (e.g. giving it a new
+    dependent) makes a copy of that node and of the nodes above it. Beam
+    items therefore share every cell they have in common.
+
+    Besides the token, a node carries what the features need about it:
+    whether it has a head and the outermost dependents attached so far.
+    len(node) is the stack depth; the empty stack EMPTY has depth 0.
+    """
+
+    __slots__ = ("token", "below", "depth", "has_head", "lc", "lc_label", "rc", "rc_label")
+
+    def __init__(self, token, below, has_head=False, lc=-1, lc_label=None, rc=-1, rc_label=None):
+        self.token = token
+        self.below = below
+        self.depth = below.depth + 1 if below is not None else 0
+        self.has_head = has_head
+        self.lc = lc
+        self.lc_label = lc_label
+        self.rc = rc
+        self.rc_label = rc_label
+
+    def __len__(self):
+        return self.depth
+
+    def __iter__(self):
+        """Tokens from TOP down."""
+        node = self
+        while node.depth:
+            yield node.token
+            node = node.below
+
+    def on(self, below):
+        """This node moved onto a different stack."""
+        return StackNode(self.token, below, self.has_head, self.lc, self.lc_label, self.rc, self.rc_label)
+
+    def with_arc(self, head, dep, label):
+        """Copy of this node after adding the arc head -> dep."""
+        node = self.on(self.below)
+        if node.token == dep:
+            node.has_head = True
+        if node.token == head:
+            if dep < head:
+                if node.lc < 0 or dep < node.lc:
+                    node.lc, node.lc_label = dep, label
+            elif dep > node.rc:
+                node.rc, node.rc_label = dep, label
+        return node
+
+
+EMPTY = StackNode(-1, None)
+
+
+class State:
+    """Persistent parser configuration for beam search.
+
+    Same read interface as Configuration (top, second, next, buffer_empty,
+    has_head, window, outer_labels; stack supports len() and truth tests),
+    but shift/pop/pop_second/add_arc return a new State and leave this one
+    unchanged, so each costs O(1) instead of copying lists:
+    - stack: StackNode linked list, TOP first
+    - b: the buffer is tokens b..n-1; front is the StackNode for token b
+      once it has an arc (None while it has none; its depth is 0 until
+      it is shifted)
+    - arcs: parent-pointer chain of (head, dep, label, previous) tuples,
+      newest first
+    - score: model score of the transitions that led here
+    """
+
+    __slots__ = ("stack", "b", "n", "front", "arcs", "score")
+
+    def __init__(self, stack, b, n, front=None, arcs=None, score=0.0):
+        self.stack = stack
+        self.b = b
+        self.n = n
+        self.front = front
+        self.arcs = arcs
+        self.score = score
+
+    @classmethod
+    def initial(cls, n):
+        """Initial state for n tokens including ROOT: stack [0], buffer 1..n-1."""
+        return cls(StackNode(0, EMPTY), 1, n)
+
+    @property
+    def top(self):
+        return self.stack.token
+
+    @property
+    def second(self):
+        return self.stack.below.token
+
+    @property
+    def next(self):
+        return self.b
+
+    @property
+    def buffer_empty(self):
+        return self.b >= self.n
+
+    def _node(self, token):
+        # Buffer tokens are never on the stack, and the stack cells asked
+        # about are the ones near TOP, so this is O(1) in practice
+        if token >= self.b:
+            return self.front if token == self.b else None
+        node = self.stack
+        while node.depth:
+            if node.token == token:
+                return node
+            node = node.below
+        return None
+
+    def has_head(self, token):
+        node = self._node(token)
+        return node is not None and node.has_head
+
+    def window(self):
+        """(s0, s1, s2, b0, b1, b2) as in Configuration.window()."""
+        s = self.stack
+        s0 = s.token
+        s = s.below or EMPTY
+        s1 = s.token
+        s2 = s.below.token if s.depth else -1
+        b, n = self.b, self.n
+        return (s0, s1, s2,
+                b if b < n else -1,
+                b + 1 if b + 1 < n else -1,
+                b + 2 if b + 2 < n else -1)
+
+    def outer_labels(self, token):
+        node = self._node(token)
+        if node is None:
+            return None, None
+        return node.lc_label, node.rc_label
+
+    def shift(self):
+        node = self.front.on(self.stack) if self.front is not None else StackNode(self.b, self.stack)
+        return State(node, self.b + 1, self.n, None, self.arcs, self.score)
+
+    def pop(self):
+        return State(self.stack.below, self.b, self.n, self.front, self.arcs, self.score)
+
+    def pop_second(self):
+        """Remove the item below TOP."""
+        top = self.stack
+        return State(top.on(top.below.below), self.b, self.n, self.front, self.arcs, self.score)
+
+    def add_arc(self, head, dep, label):
+        touched = (head, dep)
+        top = self.stack
+        if top.depth:
+            second = top.below
+            if second.depth and second.token in touched:
+                top = top.on(second.with_arc(head, dep, label))
+            if top.token in touched:
+                top = top.with_arc(head, dep, label)
+        front = self.front
+        if self.b in touched:
+            if front is None:
+                front = StackNode(self.b, None)
+            front = front.with_arc(head, dep, label)
+        return State(top, self.b, self.n, front, (head, dep, label, self.arcs), self.score)
+
+    def arc_list(self):
+        """Arcs in the order they were added."""
+        arcs = []
+        link = self.arcs
+        while link is not None:
+            arcs.append(link[:3])
+            link = link[3]
+        arcs.reverse()
+        return arcs
+
+    def to_configuration(self):
+        """Equivalent (mutable) Configuration, built in O(n)."""
+        config = Configuration(self.n)
+        config.stack = list(self.stack)[::-1]
+        config.b = self.b
+        for head, dep, label in self.arc_list():
+            config.add_arc(head, dep, label)
+        return config
+
+
+def log_softmax(scores):
+    top = max(scores)
+    log_z = top + math.log(sum(math.exp(s - top) for s in scores))
+    return [s - log_z for s in scores]
+
+
+def beam_search(parser, words, tags, width):
+    """Parse with a beam of `width` States; returns the best final State.
+
+    Items are ranked by the summed action-model scores of their
+    transitions. Each item is expanded with every legal action, but
+    successors (and their arc labels, from the label model) are only built
+    for the `width` best candidates, so a step costs O(width * actions)
+    scoring plus O(1) per kept item. Items that reach a terminal state stay
+    in the beam and compete with longer ones. With width 1 this makes the
+    same decisions as greedy parsing.
+    """
+    system = parser.system
+    extractor = parser.extractor
+    action_model = parser.action_model
+    label_model = parser.label_model
+    labels = parser.labels
+    is_terminal = system.is_terminal
+    legal_actions = system.legal_actions
+
+    beam = [State.initial(len(words))]
+    while True:
+        candidates = []
+        expanded = False
+        for state in beam:
+            legal = None if is_terminal(state) else legal_actions(state)
+            if not legal:
+                candidates.append((state.score, state, None))
+                continue
+            expanded = True
+            scores = action_model.scores(extractor(state, words, tags))
+            for action, logp in zip(legal, log_softmax([scores[a] for a in legal])):
+                candidates.append((state.score + logp, state, action))
+        if not expanded:
+            break
+
+        beam = []
+        for score, state, action in heapq.nlargest(width, candidates, key=itemgetter(0)):
+            if action is None:
+                beam.append(state)
+                continue
+            arc = system.arc(action, state)
+            if arc is None:
+                label = "_"
+            else:
+                label = labels[label_model.predict(extractor.arc_features(state, words, tags, action, *arc))]
+            new = system.successor((action, label), state)
+            if new is not None:
+                new.score = score
+                beam.append(new)
+        if not beam:
+            break
+    return max(beam, key=lambda state: state.score) if beam else State.initial(len(words))
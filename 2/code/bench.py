@@ -0,0 +1,213 @@
+import argparse
+import gc
+import json
+import math
+import os
+import random
+import sys
+import time
+
+from configuration import Configuration
+from evaluate import score_sentences
+from readers import read_corpus
+from systems import SYSTEMS, get_system, oracle_steps
+
+DEFAULT_CORPORA = ["en-ud-dev.tab", "hindi_dev.tab", "hindi_test.tab"]
+DEFAULT_LENGTHS = [10, 20, 40, 80, 160, 320, 640]
+DEFAULT_BASELINE = "bench_baseline.json"
+
+
+def random_projective_sentence(n, rng):
+    """Token rows [WORD, POS, HEAD, DEPREL] of a random projective tree over n tokens.
+
+    Each span picks a random head, attached to the span's parent; the parts
+    left and right of it become spans under that head.
+    """
+    heads = [0] * (n + 1)
+    spans = [(1, n + 1, 0)]
+    while spans:
+        lo, hi, parent = spans.pop()
+        if lo >= hi:
+            continue
+        h = rng.randrange(lo, hi)
+        heads[h] = parent
+        spans.append((lo, h, h))
+        spans.append((h + 1, hi, h))
+    return [[f"w{i}", "X", str(heads[i]), "dep"] for i in range(1, n + 1)]
+
+
+def gold_columns(sentence):
+    return [0] + [int(tok[2]) for tok in sentence], ["_"] + [tok[3] for tok in sentence]
+
+
+def run_oracle(system, sentences):
+    """Derive every sentence with the static oracle; returns the number of transitions."""
+    transitions = 0
+    for sentence in sentences:
+        gold_heads, gold_labels = gold_columns(sentence)
+        for _ in oracle_steps(system, gold_heads, gold_labels, Configuration(len(gold_heads))):
+            transitions += 1
+    return transitions
+
+
+def run_evaluate(system_name, sentences):
+    """The evaluate.py driver (oracle parse, orphan attachment, scoring); returns 0."""
+    score_sentences(sentences, system_name, 0)
+    return 0
+
+
+def best_of(fn, repeat):
+    """(best seconds, result) over repeat runs of fn(), with the GC paused as in timeit."""
+    best = float("inf")
+    result = None
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = fn()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return best, result
+
+
+def bench_corpus(system_name, sentences, repeat):
+    """Throughput of the oracle and of the evaluate driver on one corpus."""
+    system = get_system(system_name)
+    n_sentences = len(sentences)
+    n_tokens = sum(map(len, sentences))
+    seconds, transitions = best_of(lambda: run_oracle(system, sentences), repeat)
+    results = {
+        "oracle": {
+            "sentences_per_s": n_sentences / seconds,
+            "tokens_per_s": n_tokens / seconds,
+            "transitions_per_s": transitions / seconds,
+        }
+    }
+    seconds, _ = best_of(lambda: run_evaluate(system_name, sentences), repeat)
+    results["evaluate"] = {
+        "sentences_per_s": n_sentences / seconds,
+        "tokens_per_s": n_tokens / seconds,
+    }
+    return results
+
+
+def fit_exponent(lengths, seconds_per_sentence):
+    """Least-squares slope of log(time per sentence) against log(length).
+
+    About 1 for linear-time parsing, about 2 for quadratic.
+    """
+    xs = [math.log(n) for n in lengths]
+    ys = [math.log(t) for t in seconds_per_sentence]
+    mx = sum(xs) / len(xs)
+    my = sum(ys) / len(ys)
+    var = sum((x - mx) ** 2 for x in xs)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / var if var else 0.0
+
+
+def bench_scaling(system_name, lengths, tokens_per_length, repeat, seed=0):
+    """Time per sentence on synthetic trees of each length, and the fitted exponent."""
+    system = get_system(system_name)
+    rng = random.Random(seed)
+    curves = {"oracle": [], "evaluate": []}
+    for n in lengths:
+        count = max(1, tokens_per_length // n)
+        sentences = [random_projective_sentence(n, rng) for _ in range(count)]
+        seconds, _ = best_of(lambda: run_oracle(system, sentences), repeat)
+        curves["oracle"].append(seconds / count)
+        seconds, _ = best_of(lambda: run_evaluate(system_name, sentences), repeat)
+        curves["evaluate"].append(seconds / count)
+    return {
+        name: {
+            "lengths": list(lengths),
+            "us_per_token": [t / n * 1e6 for t, n in zip(per_sentence, lengths)],
+            "exponent": fit_exponent(lengths, per_sentence),
+        }
+        for name, per_sentence in curves.items()
+    }
+
+
+def compare(results, baseline, threshold, max_exponent):
+    """Lines describing regressions: throughput below baseline * (1 - threshold), or super-linear scaling."""
+    failures = []
+    for key, metrics in results["corpora"].items():
+        for name, value in metrics.items():
+            base = baseline.get("corpora", {}).get(key, {}).get(name)
+            if base and value < base * (1 - threshold):
+                failures.append(f"{key} {name}: {value:.0f} vs baseline {base:.0f} ({value / base - 1:+.0%})")
+    for key, curve in results["scaling"].items():
+        if curve["exponent"] > max_exponent:
+            failures.append(f"{key} scales as n^{curve['exponent']:.2f} (limit n^{max_exponent})")
+    return failures
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the transition systems, their oracles and the evaluate.py driver.")
+    ap.add_argument("--corpora", nargs="*", default=DEFAULT_CORPORA,
+                    help="Corpora to time (.tab, CoNLL or directories); missing ones are skipped.")
+    ap.add_argument("--systems", nargs="+", choices=sorted(SYSTEMS), default=sorted(SYSTEMS))
+    ap.add_argument("--lengths", type=int, nargs="*", default=DEFAULT_LENGTHS,
+                    help="Synthetic sentence lengths for the scaling curves.")
+    ap.add_argument("--scaling-tokens", type=int, default=20000, help="Synthetic tokens per length.")
+    ap.add_argument("--repeat", type=int, default=5, help="Report the best of N runs.")
+    ap.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare with (if it exists).")
+    ap.add_argument("--save-baseline", action="store_true", help="Write the results to --baseline instead of comparing.")
+    ap.add_argument("--threshold", type=float, default=0.3,
+                    help="Fail if a throughput drops by more than this fraction of the baseline.")
+    ap.add_argument("--max-exponent", type=float, default=1.3,
+                    help="Fail if time per sentence grows faster than length**this.")
+    ap.add_argument("--json", metavar="PATH", help="Also write the results as JSON.")
+    args = ap.parse_args()
+
+    results = {"corpora": {}, "scaling": {}}
+    for path in args.corpora:
+        if not os.path.exists(path):
+            print(f"Skipping {path}: not found")
+            continue
+        sentences = list(read_corpus(path))
+        name = os.path.basename(os.path.normpath(path))
+        print(f"{name}: {len(sentences)} sentences, {sum(map(len, sentences))} tokens")
+        for system_name in args.systems:
+            for bench, metrics in bench_corpus(system_name, sentences, args.repeat).items():
+                results["corpora"][f"{name}/{system_name}/{bench}"] = metrics
+                line = ", ".join(f"{value:,.0f} {metric.replace('_per_s', '')}/s" for metric, value in metrics.items())
+                print(f"  {system_name:<13} {bench:<9} {line}")
+
+    if len(args.lengths) > 1:
+        print(f"Scaling ({args.scaling_tokens} synthetic tokens per length, µs per token):")
+        print(f"  {'':<23}" + "".join(f"{n:>8}" for n in args.lengths) + "  exponent")
+        for system_name in args.systems:
+            for bench, curve in bench_scaling(system_name, args.lengths, args.scaling_tokens, args.repeat).items():
+                results["scaling"][f"{system_name}/{bench}"] = curve
+                print(f"  {system_name:<13} {bench:<9}" + "".join(f"{t:8.2f}" for t in curve["us_per_token"])
+                      + f"  {curve['exponent']:8.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    else:
+        print(f"No baseline at {args.baseline} (create one with --save-baseline); checking scaling only")
+    failures = compare(results, baseline, args.threshold, args.max_exponent)
+    if failures:
+        print("REGRESSIONS:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("OK: no regressions" + (f" against {args.baseline}" if baseline else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import argparse
+import time
+import tracemalloc
+from itertools import islice
+
+from extract_features import sentence_columns
+from perceptron import GreedyParser
+from readers import read_corpus
+
+
+def run(parser, sentences, beam):
+    """(tokens, uas_ok, las_ok, seconds) for parsing sentences with one beam width."""
+    total = uas_ok = las_ok = 0
+    start = time.perf_counter()
+    for sentence in sentences:
+        words, tags, gold_heads, gold_labels = sentence_columns(sentence)
+        config = parser.parse(words, tags, beam)
+        for i in range(1, len(words)):
+            total += 1
+            if config.heads[i] == gold_heads[i]:
+                uas_ok += 1
+                las_ok += config.labels[i] == gold_labels[i]
+    return total, uas_ok, las_ok, time.perf_counter() - start
+
+
+def peak_memory(parser, sentences, beam):
+    """Largest tracemalloc peak (bytes) while parsing any one sentence."""
+    peak = 0
+    tracemalloc.start()
+    for sentence in sentences:
+        words, tags, _, _ = sentence_columns(sentence)
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        parser.parse(words, tags, beam)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare greedy and beam-search decoding of a trained parser.")
+    ap.add_argument("model", help="Model file from perceptron.py train.")
+    ap.add_argument("tab_file", help="Gold corpus (.tab, CoNLL file or directory) to parse and score.")
+    ap.add_argument("--widths", type=int, nargs="+", default=[1, 2, 4, 8], help="Beam widths (1 = greedy).")
+    ap.add_argument("--limit", type=int, help="Only use the first N sentences.")
+    args = ap.parse_args()
+
+    parser = GreedyParser.load(args.model)
+    sentences = list(islice(read_corpus(args.tab_file), args.limit))
+    print(f"System: {parser.system_name}")
+    print(f"Sentences: {len(sentences)}")
+    print(f"{'beam':>6} {'UAS':>7} {'LAS':>7} {'sent/s':>8} {'tok/s':>8} {'peak KiB':>9}")
+    for width in args.widths:
+        total, uas_ok, las_ok, seconds = run(parser, sentences, width)
+        peak = peak_memory(parser, sentences, width)
+        name = "greedy" if width <= 1 else str(width)
+        print(f"{name:>6} {uas_ok / total if total else 0:7.4f} {las_ok / total if total else 0:7.4f} "
+              f"{len(sentences) / seconds:8.0f} {total / seconds:8.0f} {peak / 1024:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+class Configuration:
+    """Parser configuration with O(1) transitions and head checks.
+
+    - stack: list[int] with the TOP at the END (push/pop are O(1))
+    - buffer: tokens order[b:], so taking NEXT is a pointer increment
+    - heads/labels: per-token head and label (-1 / None while unattached)
+    - leftmost/rightmost: per-token outermost dependent so far (-1 if none)
+    - arcs: list[tuple[int,int,str]] in the order they were added
+
+    Configuration(n) is the initial configuration for a sentence of n
+    tokens including ROOT: stack [0], buffer 1..n-1.
+    """
+
+    __slots__ = ("stack", "order", "b", "heads", "labels", "leftmost", "rightmost", "arcs")
+
+    def __init__(self, n):
+        self.stack = [0]
+        self.order = range(n)
+        self.b = 1
+        self.heads = [-1] * n
+        self.labels = [None] * n
+        self.leftmost = [-1] * n
+        self.rightmost = [-1] * n
+        self.arcs = []
+
+    @classmethod
+    def from_lists(cls, stack, buffer, arcs):
+        """Build a configuration from the list representation (stack[0] is TOP)."""
+        nodes = list(stack) + list(buffer) + [x for (h, d, _) in arcs for x in (h, d)]
+        config = cls(max(nodes, default=0) + 1)
+        config.stack = list(reversed(stack))
+        config.order = list(buffer)
+        config.b = 0
+        for (h, d, l) in arcs:
+            config.add_arc(h, d, l)
+        return config
+
+    @property
+    def top(self):
+        return self.stack[-1]
+
+    @property
+    def second(self):
+        return self.stack[-2]
+
+    @property
+    def next(self):
+        return self.order[self.b]
+
+    @property
+    def buffer_empty(self):
+        return self.b >= len(self.order)
+
+    def shift(self):
+        self.stack.append(self.order[self.b])
+        self.b += 1
+
+    def pop(self):
+        return self.stack.pop()
+
+    def pop_second(self):
+        """Remove the item below TOP."""
+        top = self.stack.pop()
+        second = self.stack[-1]
+        self.stack[-1] = top
+        return second
+
+    def add_arc(self, head, dep, label):
+        self.heads[dep] = head
+        self.labels[dep] = label
+        if dep < head:
+            if self.leftmost[head] < 0 or dep < self.leftmost[head]:
+                self.leftmost[head] = dep
+        elif dep > self.rightmost[head]:
+            self.rightmost[head] = dep
+        self.arcs.append((head, dep, label))
+
+    def has_head(self, node):
+        return self.heads[node] >= 0
+
+    def window(self):
+        """(s0, s1, s2, b0, b1, b2): top three stack items and next three buffer tokens, -1 if absent."""
+        stack = self.stack
+        order = self.order
+        b = self.b
+        n_stack = len(stack)
+        n_buffer = len(order) - b
+        return (stack[-1] if n_stack > 0 else -1,
+                stack[-2] if n_stack > 1 else -1,
+                stack[-3] if n_stack > 2 else -1,
+                order[b] if n_buffer > 0 else -1,
+                order[b + 1] if n_buffer > 1 else -1,
+                order[b + 2] if n_buffer > 2 else -1)
+
+    def outer_labels(self, node):
+        """Labels of node's leftmost and rightmost dependents so far (None if none)."""
+        lc = self.leftmost[node]
+        rc = self.rightmost[node]
+        return (self.labels[lc] if lc >= 0 else None,
+                self.labels[rc] if rc >= 0 else None)
+
+    def stack_list(self):
+        """Stack in the list representation (TOP first)."""
+        return self.stack[::-1]
+
+    def buffer_list(self):
+        return list(self.order[self.b:])
+
+    def write_back(self, stack, buffer, arcs):
+        """Update list-representation stack/buffer/arcs in place to match."""
+        stack[:] = self.stack_list()
+        buffer[:] = self.buffer_list()
+        arcs[len(arcs):] = self.arcs[len(arcs):]
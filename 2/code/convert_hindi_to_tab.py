@@ -1,43 +1,143 @@
+import argparse
 import os
-import sys
 import glob
+from concurrent.futures import ProcessPoolExecutor
+
+def convert_lines(lines):
+    """Yield .tab lines (with newline) for the lines of one HDTB CoNLL file."""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            yield '\n'
+            continue
+
+        parts = line.split('\t')
+        if len(parts) >= 8:
+            # Extract relevant columns
+            # Index (1-based) is parts[0]
+            word = parts[1]
+            pos = parts[4] # Using Coarse POS (5th column)
+            head = parts[6]
+            deprel = parts[7]
+
+            # Write to tab format: WORD<TAB>POS<TAB>HEAD<TAB>DEPREL
+            yield f"{word}\t{pos}\t{head}\t{deprel}\n"
+        else:
+            # Handle cases where line might be malformed or different
+            pass
+
+def convert_file(filepath):
+    """The .tab text for one .dat file."""
+    with open(filepath, 'r', encoding='utf-8') as infile:
+        return ''.join(convert_lines(infile))
 
 def convert_dat_to_tab(input_dir, output_file):
     with open(output_file, 'w', encoding='utf-8') as outfile:
-        # Walk recursively or just list files in the dir? 
-        # The structure is .../Development/*.dat
-        # I'll just use glob
+        # Only the top level of input_dir; see convert_trees for recursive roots
         files = glob.glob(os.path.join(input_dir, '*.dat'))
         files.sort() # Ensure deterministic order (optional but good practice)
-        
+
         for filepath in files:
-            with open(filepath, 'r', encoding='utf-8') as infile:
-                for line in infile:
-                    line = line.strip()
-                    if not line:
-                        outfile.write('\n')
-                        continue
-                    
-                    parts = line.split('\t')
-                    if len(parts) >= 8:
-                        # Extract relevant columns
-                        # Index (1-based) is parts[0]
-                        word = parts[1]
-                        pos = parts[4] # Using Coarse POS (5th column)
-                        head = parts[6]
-                        deprel = parts[7]
-                        
-                        # Write to tab format: WORD<TAB>POS<TAB>HEAD<TAB>DEPREL
-                        outfile.write(f"{word}\t{pos}\t{head}\t{deprel}\n")
-                    else:
-                        # Handle cases where line might be malformed or different
-                        pass
+            outfile.write(convert_file(filepath))
+
+def find_dat_files(roots):
+    """(files, directories) under roots, recursively.
+
+    Files are the .dat files of each root in sorted path order, roots in the
+    order given; directories are every directory walked (used to notice
+    added or removed files).
+    """
+    files = []
+    dirs = []
+    for root in roots:
+        if os.path.isfile(root):
+            files.append(root)
+            continue
+        found = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            dirs.append(dirpath)
+            found.extend(os.path.join(dirpath, name) for name in filenames if name.endswith('.dat'))
+        files.extend(sorted(found))
+    return files, dirs
+
+def is_up_to_date(output_file, files, dirs):
+    """True if output_file is newer than every input file and directory."""
+    try:
+        built = os.stat(output_file).st_mtime_ns
+    except FileNotFoundError:
+        return False
+    return all(os.stat(path).st_mtime_ns <= built for path in files + dirs)
+
+def convert_trees(targets, jobs=1, force=False, buffer_size=1 << 20, log=None):
+    """Convert several (output_file, roots) targets, sharing one process pool.
+
+    Input files are converted in parallel but written in the order of
+    find_dat_files, so the output is the same for any number of jobs.
+    Targets whose output is newer than all their inputs are skipped unless
+    force is set. Each output is written to a temporary file with large
+    buffered writes and renamed into place when complete.
+    Returns the list of outputs that were (re)generated.
+    """
+    pending = []
+    for output_file, roots in targets:
+        for root in roots:
+            if not os.path.exists(root):
+                raise FileNotFoundError(f"Input not found: {root}")
+        files, dirs = find_dat_files(roots)
+        if not force and is_up_to_date(output_file, files, dirs):
+            if log:
+                log(f"{output_file} is up to date ({len(files)} files)")
+            continue
+        pending.append((output_file, files))
+    if not pending:
+        return []
+
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    try:
+        for output_file, files in pending:
+            if pool is None:
+                texts = map(convert_file, files)
+            else:
+                # map() yields results in input order
+                texts = pool.map(convert_file, files, chunksize=max(1, len(files) // (4 * jobs)))
+            tmp_file = output_file + '.tmp'
+            with open(tmp_file, 'w', encoding='utf-8', buffering=buffer_size) as outfile:
+                for text in texts:
+                    outfile.write(text)
+            os.replace(tmp_file, output_file)
+            if log:
+                log(f"Created {output_file} from {len(files)} files")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return [output_file for output_file, _ in pending]
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Convert HDTB CoNLL .dat files to .tab (WORD<TAB>POS<TAB>HEAD<TAB>DEPREL).",
+        epilog="Example: convert_hindi_to_tab.py --target hindi_dev.tab DEV_DIR --target hindi_test.tab TEST_DIR")
+    ap.add_argument("input_dir", nargs="?", help="Directory whose top-level .dat files are converted.")
+    ap.add_argument("output_file", nargs="?", help="Output .tab file for input_dir.")
+    ap.add_argument("--target", nargs="+", action="append", default=[], metavar=("OUTPUT", "ROOT"),
+                    help="Write OUTPUT from the .dat files found recursively under each ROOT (repeatable).")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes for --target.")
+    ap.add_argument("--force", action="store_true", help="Regenerate outputs even if they are up to date.")
+    args = ap.parse_args()
+
+    if (args.input_dir is None) != (args.output_file is None):
+        ap.error("input_dir and output_file go together")
+    if args.input_dir is None and not args.target:
+        ap.error("give input_dir output_file, or at least one --target")
+    for target in args.target:
+        if len(target) < 2:
+            ap.error("--target needs an OUTPUT and at least one ROOT")
+
+    if args.input_dir is not None:
+        convert_dat_to_tab(args.input_dir, args.output_file)
+    if args.target:
+        targets = [(target[0], target[1:]) for target in args.target]
+        convert_trees(targets, args.jobs, args.force, log=print)
 
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python3 convert_hindi_to_tab.py <input_dir> <output_file>")
-        sys.exit(1)
-    
-    input_dir = sys.argv[1]
-    output_file = sys.argv[2]
-    convert_dat_to_tab(input_dir, output_file)
+    main()
@@ -1,21 +1,24 @@
 import argparse
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from perceptron import GreedyParser
+from profiling import Profile
+from readers import read_corpus
+from scoring import Scores
+from systems import SYSTEMS, derive, get_system
+from transition_cache import TransitionCache
+
+# Sentences per work item sent to a worker process by --jobs
+CHUNK_SIZE = 256
 
 
 def read_sentences(path):
-    sentences = []
-    sentence = []
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                if sentence:
-                    sentences.append(sentence)
-                sentence = []
-            elif line[0] != "#":
-                sentence.append(line.split("\t"))
-    if sentence:
-        sentences.append(sentence)
-    return sentences
+    """Stream the sentences of a .tab/CoNLL file or directory (see readers.read_corpus)."""
+    return read_corpus(path)
 
 
 def attach_orphans(arcs, n):
@@ -35,42 +38,49 @@ def arcs_to_heads_labels(arcs, n):
     return heads, labels
 
 
-def parse_with_oracle(sentence, system_name):
+def parse_with_oracle(sentence, system_name, profile=None, cache=None):
     sentence = [("root", "_", "0", "_")] + [tuple(tok) for tok in sentence]
     words = [sentence[i][0] for i in range(len(sentence))]
     tags = [sentence[i][1] for i in range(len(sentence))]
     gold_heads = [int(sentence[i][2]) for i in range(len(sentence))]
     gold_labels = [sentence[i][3] for i in range(len(sentence))]
 
-    if system_name == "arc-standard":
-        import arc_standard as sysmod
-    else:
-        import arc_eager as sysmod
-
-    stack = [0]
-    buffer = [i for i in range(1, len(words))]
-    arcs = []
-
-    # Safety bound to avoid infinite loops on unexpected data.
-    max_steps = 10 * (len(words) + 1) ** 2
-    steps = 0
-    if system_name == "arc-standard":
-        while (buffer or len(stack) > 1) and steps < max_steps:
-            trans = sysmod.oracle(stack, buffer, gold_heads, gold_labels, arcs)
-            prev = (tuple(stack), tuple(buffer), len(arcs))
-            stack, buffer, arcs = sysmod.transition(trans, stack, buffer, arcs)
-            if (tuple(stack), tuple(buffer), len(arcs)) == prev:
-                break
-            steps += 1
-    else:
-        while buffer and steps < max_steps:
-            trans = sysmod.oracle(stack, buffer, gold_heads, gold_labels, arcs)
-            prev = (tuple(stack), tuple(buffer), len(arcs))
-            stack, buffer, arcs = sysmod.transition(trans, stack, buffer, arcs)
-            if (tuple(stack), tuple(buffer), len(arcs)) == prev:
-                break
-            steps += 1
+    transitions = cache.transitions(sentence[1:], gold_heads, gold_labels) if cache is not None else None
+    arcs = derive(get_system(system_name), gold_heads, gold_labels, profile, transitions).arcs
+    attach_orphans(arcs, len(words))
+    pred_heads, pred_labels = arcs_to_heads_labels(arcs, len(words))
+
+    return {
+        "words": words,
+        "tags": tags,
+        "gold_heads": gold_heads,
+        "gold_labels": gold_labels,
+        "pred_heads": pred_heads,
+        "pred_labels": pred_labels,
+    }
+
+
+# Loaded models by path, so each worker process reads a model once
+_parsers = {}
+# Opened transition caches by (directory, system), likewise
+_caches = {}
+
+
+def load_parser(model_path):
+    parser = _parsers.get(model_path)
+    if parser is None:
+        parser = _parsers[model_path] = GreedyParser.load(model_path)
+    return parser
 
+
+def parse_with_model(sentence, parser, beam=1):
+    """Like parse_with_oracle, but the tree is predicted by a trained parser."""
+    words = ["root"] + [tok[0] for tok in sentence]
+    tags = ["_"] + [tok[1] for tok in sentence]
+    gold_heads = [0] + [int(tok[2]) for tok in sentence]
+    gold_labels = ["_"] + [tok[3] for tok in sentence]
+
+    arcs = parser.parse(words, tags, beam).arcs
     attach_orphans(arcs, len(words))
     pred_heads, pred_labels = arcs_to_heads_labels(arcs, len(words))
 
@@ -84,48 +94,170 @@ def parse_with_oracle(sentence, system_name):
     }
 
 
+def score_sentences(sentences, system_name, show, model_path=None, beam=1, profile=None, cache=None):
+    """Parse an iterable of sentences, one at a time, and collect their scores.
+
+    Trees come from the system's oracle, or from the parser saved at
+    model_path if one is given (beam search if beam > 1). Oracle runs are
+    recorded in profile, a profiling.Profile, if one is given; with a
+    transition_cache.TransitionCache, cached oracle transitions are replayed.
+
+    Returns (scores, mismatches): a scoring.Scores holding every token, and
+    the first `show` head mismatches, in sentence order, as printable text.
+    """
+    scores = Scores()
+    mismatches = []
+
+    parser = load_parser(model_path) if model_path else None
+    for sent in sentences:
+        if parser is None:
+            parsed = parse_with_oracle(sent, system_name, profile, cache)
+        else:
+            parsed = parse_with_model(sent, parser, beam)
+        scores.add(parsed)
+
+        gold_h = parsed["gold_heads"]
+        pred_h = parsed["pred_heads"]
+        if len(mismatches) < show and pred_h != gold_h:
+            words = parsed["words"]
+            gold_l = parsed["gold_labels"]
+            pred_l = parsed["pred_labels"]
+            for i in range(1, len(words)):
+                if pred_h[i] != gold_h[i] and len(mismatches) < show:
+                    mismatches.append(
+                        "Mismatch:\n"
+                        f"  sent: {' '.join(words[1:])}\n"
+                        f"  token: {i}\t{words[i]}\n"
+                        f"  gold:  head={gold_h[i]} label={gold_l[i]}\n"
+                        f"  pred:  head={pred_h[i]} label={pred_l[i]}\n"
+                    )
+
+    return scores, mismatches
+
+
+def _score_chunk(args):
+    # Process-pool worker; module-level so it can be pickled
+    chunk, system_name, show, model_path, beam, profiled, cache_dir = args
+    profile = Profile(system_name) if profiled else None
+    cache = None
+    if cache_dir is not None:
+        if (cache_dir, system_name) not in _caches:
+            _caches[cache_dir, system_name] = TransitionCache(cache_dir, system_name)
+        cache = _caches[cache_dir, system_name]
+        cache.stats.clear()
+    scores, mismatches = score_sentences(chunk, system_name, show, model_path, beam, profile, cache)
+    if cache is not None:
+        # Workers cannot flush at exit, so new entries are written per chunk
+        cache.flush()
+    return scores, mismatches, profile, cache.stats if cache is not None else None
+
+
+def iter_chunks(sentences, size):
+    """Yield lists of up to `size` consecutive sentences."""
+    sentences = iter(sentences)
+    while True:
+        chunk = list(islice(sentences, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def score_parallel(sentences, system_name, show, jobs, model_path=None, beam=1, profile=None, cache=None):
+    """score_sentences over chunks of the stream in a pool of `jobs` processes.
+
+    At most 2 * jobs chunks are in flight, so memory stays bounded for any
+    input size. Chunk results are merged in sentence order, so the counts
+    and the mismatch examples are the same as a serial run.
+    """
+    if jobs <= 1:
+        return score_sentences(sentences, system_name, show, model_path, beam, profile, cache)
+
+    scores = Scores()
+    mismatches = []
+
+    def merge(result):
+        c_scores, c_mismatches, c_profile, c_stats = result
+        scores.merge(c_scores)
+        if profile is not None:
+            profile.merge(c_profile)
+        if cache is not None:
+            cache.stats.update(c_stats)
+        mismatches.extend(c_mismatches[:show - len(mismatches)])
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+        for chunk in iter_chunks(sentences, CHUNK_SIZE):
+            pending.append(pool.submit(_score_chunk, (chunk, system_name, show, model_path, beam, profile is not None,
+                                                      cache.root if cache is not None else None)))
+            if len(pending) >= 2 * jobs:
+                merge(pending.popleft().result())
+        while pending:
+            merge(pending.popleft().result())
+    return scores, mismatches
+
+
 def main():
     ap = argparse.ArgumentParser(description="Evaluate oracle-derived trees vs gold (.tab format).")
-    ap.add_argument("tab_file", help="Path to a .tab file (blank-line separated sentences).")
-    ap.add_argument("--system", choices=["arc-eager", "arc-standard"], default="arc-eager")
+    ap.add_argument("tab_file", help="Corpus to read: a .tab or CoNLL .dat/.conll file, or a directory of them.")
+    ap.add_argument("--system", choices=sorted(SYSTEMS), default="arc-eager")
     ap.add_argument("--show", type=int, default=5, help="Show up to N example mismatches.")
+    ap.add_argument("--jobs", type=int, default=1, help="Parse sentences with N worker processes.")
+    ap.add_argument("--model", help="Score a trained parser (see perceptron.py) instead of the oracle.")
+    ap.add_argument("--beam", type=int, default=1, help="Beam width for --model (1 = greedy).")
+    ap.add_argument("--json", metavar="PATH",
+                    help="Also write scores with per-label/POS/length/distance/direction breakdowns as JSON.")
+    ap.add_argument("--profile", metavar="PATH",
+                    help="Count transitions, steps, stalls, oracle fallbacks and oracle/apply time; write them as JSON.")
+    ap.add_argument("--cache", metavar="DIR",
+                    help="Replay oracle transitions cached in DIR (see transition_cache.py), adding missing ones.")
     args = ap.parse_args()
+    if args.profile and args.model:
+        ap.error("--profile records oracle runs and cannot be combined with --model")
+    if args.cache and (args.model or args.profile):
+        ap.error("--cache replaces oracle runs and cannot be combined with --model or --profile")
 
-    sentences = read_sentences(args.tab_file)
-    total = 0
-    uas_ok = 0
-    las_ok = 0
-    shown = 0
+    system_name = args.system
+    if args.model:
+        # The model determines the transition system
+        system_name = load_parser(args.model).system_name
 
-    for sent in sentences:
-        parsed = parse_with_oracle(sent, args.system)
-        words = parsed["words"]
-        gold_h = parsed["gold_heads"]
-        gold_l = parsed["gold_labels"]
-        pred_h = parsed["pred_heads"]
-        pred_l = parsed["pred_labels"]
-
-        for i in range(1, len(words)):
-            total += 1
-            if pred_h[i] == gold_h[i]:
-                uas_ok += 1
-                if pred_l[i] == gold_l[i]:
-                    las_ok += 1
-            elif shown < args.show:
-                shown += 1
-                print("Mismatch:")
-                print("  sent:", " ".join(words[1:]))
-                print(f"  token: {i}\t{words[i]}")
-                print(f"  gold:  head={gold_h[i]} label={gold_l[i]}")
-                print(f"  pred:  head={pred_h[i]} label={pred_l[i]}")
-                print()
+    profile = Profile(system_name) if args.profile else None
+    start = time.perf_counter()
+    cache = TransitionCache(args.cache, system_name) if args.cache else None
+    scores, mismatches = score_parallel(read_sentences(args.tab_file), system_name, max(args.show, 0), args.jobs,
+                                        args.model, args.beam, profile, cache)
+    if cache is not None:
+        cache.flush()
+    report = scores.report()
+    elapsed = time.perf_counter() - start
+    for mismatch in mismatches:
+        print(mismatch)
 
+    total, uas_ok, las_ok = report["tokens"], report["uas_ok"], report["las_ok"]
     uas = (uas_ok / total) if total else 0.0
     las = (las_ok / total) if total else 0.0
-    print(f"System: {args.system}")
+    print(f"System: {system_name}")
+    if args.model:
+        print(f"Model: {args.model}" + (f" (beam {args.beam})" if args.beam > 1 else ""))
     print(f"Tokens: {total}")
     print(f"UAS: {uas:.4f} ({uas_ok}/{total})")
     print(f"LAS: {las:.4f} ({las_ok}/{total})")
+    if elapsed > 0:
+        print(f"Speed: {report['sentences'] / elapsed:.0f} sentences/s, {total / elapsed:.0f} tokens/s "
+              f"({elapsed:.2f}s, {args.jobs} job(s))")
+
+    if args.json:
+        report = {"source": args.tab_file, "system": system_name, "model": args.model,
+                  "beam": args.beam if args.model else None, "seconds": round(elapsed, 3), **report}
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+
+    if cache is not None:
+        print(cache.summary())
+    if profile is not None:
+        print(profile.summary())
+        with open(args.profile, "w", encoding="utf-8") as f:
+            json.dump(profile.report(), f, indent=1)
 
 
 if __name__ == "__main__":
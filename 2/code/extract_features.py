@@ -0,0 +1,140 @@
+import argparse
+import json
+import os
+import time
+from array import array
+
+from configuration import Configuration
+from features import DEFAULT_BITS, TEMPLATES, FeatureExtractor
+from npy import save_npz
+from readers import read_corpus
+from systems import SYSTEMS, get_system, oracle_steps, replay_steps
+from transition_cache import TransitionCache
+
+
+def sentence_columns(sentence):
+    """(words, tags, gold_heads, gold_labels) with ROOT at index 0."""
+    words = ["root"] + [tok[0] for tok in sentence]
+    tags = ["_"] + [tok[1] for tok in sentence]
+    gold_heads = [0] + [int(tok[2]) for tok in sentence]
+    gold_labels = ["_"] + [tok[3] for tok in sentence]
+    return words, tags, gold_heads, gold_labels
+
+
+class ChunkWriter:
+    """Accumulates oracle examples as CSR arrays and writes them in chunks.
+
+    Each chunk is an .npz archive holding
+    - indptr (int64, rows + 1) and indices (int32): row r's feature ids are
+      indices[indptr[r]:indptr[r + 1]]
+    - actions (int8) and labels (int16): the gold transition of each row
+    - sentences (int32): the sentence number each row came from
+    """
+
+    def __init__(self, out_dir, chunk_rows):
+        self.out_dir = out_dir
+        self.chunk_rows = chunk_rows
+        self.chunks = []
+        self._reset()
+
+    def _reset(self):
+        self.indptr = array("q", [0])
+        self.indices = array("i")
+        self.actions = array("b")
+        self.labels = array("h")
+        self.sentences = array("i")
+
+    def add(self, feature_ids, action, label_id, sentence_id):
+        self.indices.extend(feature_ids)
+        self.indptr.append(len(self.indices))
+        self.actions.append(action)
+        self.labels.append(label_id)
+        self.sentences.append(sentence_id)
+
+    @property
+    def rows(self):
+        return len(self.actions)
+
+    def flush(self):
+        if not self.rows:
+            return
+        name = f"chunk-{len(self.chunks):05d}.npz"
+        save_npz(os.path.join(self.out_dir, name), indptr=self.indptr, indices=self.indices,
+                 actions=self.actions, labels=self.labels, sentences=self.sentences)
+        self.chunks.append({"file": name, "rows": self.rows, "nnz": len(self.indices)})
+        self._reset()
+
+
+def extract(sentences, system, extractor, writer, label_ids, cache=None):
+    """Run the oracle over sentences, adding one example per transition.
+
+    label_ids maps label strings to ids and is extended with new labels.
+    With a transition_cache.TransitionCache, cached transitions are replayed.
+    Returns the number of sentences read.
+    """
+    n_sentences = 0
+    for sent_id, sentence in enumerate(sentences):
+        words, tags, gold_heads, gold_labels = sentence_columns(sentence)
+        config = Configuration(len(words))
+        if cache is None:
+            steps = oracle_steps(system, gold_heads, gold_labels, config)
+        else:
+            steps = replay_steps(system, cache.transitions(sentence, gold_heads, gold_labels), config)
+        for config, (action, label) in steps:
+            label_id = label_ids.setdefault(label, len(label_ids))
+            writer.add(extractor(config, words, tags), action, label_id, sent_id)
+        n_sentences += 1
+        # Chunks end on sentence boundaries
+        if writer.rows >= writer.chunk_rows:
+            writer.flush()
+    writer.flush()
+    return n_sentences
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Extract hashed oracle features from a .tab corpus into .npz chunks.")
+    ap.add_argument("tab_file", help="Corpus to read: a .tab or CoNLL .dat/.conll file, or a directory of them.")
+    ap.add_argument("out_dir", help="Directory for chunk-NNNNN.npz files and meta.json.")
+    ap.add_argument("--system", choices=sorted(SYSTEMS), default="arc-eager")
+    ap.add_argument("--bits", type=int, default=DEFAULT_BITS, help="Hash features into 2**BITS ids.")
+    ap.add_argument("--chunk-rows", type=int, default=100000, help="Approximate examples per chunk file.")
+    ap.add_argument("--cache", metavar="DIR",
+                    help="Replay oracle transitions cached in DIR (see transition_cache.py), adding missing ones.")
+    args = ap.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    system = get_system(args.system)
+    extractor = FeatureExtractor(args.bits)
+    writer = ChunkWriter(args.out_dir, args.chunk_rows)
+    label_ids = {"_": 0}
+    cache = TransitionCache(args.cache, args.system) if args.cache else None
+
+    start = time.perf_counter()
+    n_sentences = extract(read_corpus(args.tab_file), system, extractor, writer, label_ids, cache)
+    elapsed = time.perf_counter() - start
+    if cache is not None:
+        cache.flush()
+
+    meta = {
+        "source": os.path.abspath(args.tab_file),
+        "system": args.system,
+        "bits": args.bits,
+        "templates": list(TEMPLATES),
+        "actions": {name: code for code, name in system.ACTION_NAMES.items()},
+        "labels": sorted(label_ids, key=label_ids.get),
+        "sentences": n_sentences,
+        "rows": sum(c["rows"] for c in writer.chunks),
+        "chunks": writer.chunks,
+    }
+    with open(os.path.join(args.out_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+
+    print(f"Sentences: {n_sentences}")
+    print(f"Examples: {meta['rows']} in {len(writer.chunks)} chunk(s)")
+    print(f"Time: {elapsed:.2f}s ({meta['rows'] / elapsed if elapsed else 0:.0f} examples/s)")
+    if cache is not None:
+        print(cache.summary())
+
+
+if __name__ == "__main__":
+    main()
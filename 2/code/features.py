@@ -0,0 +1,103 @@
+from zlib import crc32
+
+DEFAULT_BITS = 20
+NONE = "<none>"
+
+# Feature templates, in the order FeatureExtractor emits them. s0/s1 are
+# the top two stack items, b0..b2 the next buffer tokens, w/t word/tag,
+# lc/rc the labels of a token's leftmost/rightmost dependents so far.
+TEMPLATES = (
+    "bias",
+    "s0w", "s0t", "s0wt", "s1w", "s1t", "s2t",
+    "b0w", "b0t", "b0wt", "b1w", "b1t", "b2t",
+    "s0w_b0w", "s0t_b0t", "s1t_s0t", "s1t_s0t_b0t", "s0t_b0t_b1t",
+    "s0lc", "s0rc", "s1lc", "s1rc", "b0lc",
+    "s0h", "dist",
+)
+
+
+# Templates for labelling an arc from head h to dependent d
+ARC_TEMPLATES = (
+    "bias", "act", "hw", "ht", "dw", "dt", "ht_dt", "hw_dt", "ht_dw", "dir_dist", "dlc", "drc",
+)
+
+
+class FeatureExtractor:
+    """Hashed sparse features of a parser Configuration.
+
+    Each template instance "name=value" is hashed with CRC-32 into
+    [0, 2**bits), so feature ids need no vocabulary and are stable across
+    runs and processes.
+    """
+
+    def __init__(self, bits=DEFAULT_BITS):
+        self.bits = bits
+        self.mask = (1 << bits) - 1
+
+    def strings(self, config, words, tags):
+        """Feature strings for config, one per template.
+
+        config is a Configuration or anything with the same window(),
+        outer_labels() and has_head() (e.g. beam.State).
+        """
+        s0, s1, s2, b0, b1, b2 = config.window()
+
+        def w(i):
+            return words[i] if i >= 0 else NONE
+
+        def t(i):
+            return tags[i] if i >= 0 else NONE
+
+        outer_labels = config.outer_labels
+
+        def outer(i):
+            if i < 0:
+                return NONE, NONE
+            lc, rc = outer_labels(i)
+            return (NONE if lc is None else lc), (NONE if rc is None else rc)
+
+        s0lc, s0rc = outer(s0)
+        s1lc, s1rc = outer(s1)
+        b0lc = outer(b0)[0]
+        s0w, s0t, s1t, b0w, b0t, b1t = w(s0), t(s0), t(s1), w(b0), t(b0), t(b1)
+        if s0 >= 0 and b0 >= 0:
+            dist = str(min(b0 - s0, 5))
+        else:
+            dist = NONE
+        return [
+            "bias",
+            "s0w=" + s0w, "s0t=" + s0t, "s0wt=" + s0w + "/" + s0t,
+            "s1w=" + w(s1), "s1t=" + s1t, "s2t=" + t(s2),
+            "b0w=" + b0w, "b0t=" + b0t, "b0wt=" + b0w + "/" + b0t,
+            "b1w=" + w(b1), "b1t=" + b1t, "b2t=" + t(b2),
+            "s0w_b0w=" + s0w + "/" + b0w, "s0t_b0t=" + s0t + "/" + b0t,
+            "s1t_s0t=" + s1t + "/" + s0t, "s1t_s0t_b0t=" + s1t + "/" + s0t + "/" + b0t,
+            "s0t_b0t_b1t=" + s0t + "/" + b0t + "/" + b1t,
+            "s0lc=" + s0lc, "s0rc=" + s0rc, "s1lc=" + s1lc, "s1rc=" + s1rc, "b0lc=" + b0lc,
+            "s0h=" + ("1" if s0 >= 0 and config.has_head(s0) else "0"),
+            "dist=" + dist,
+        ]
+
+    def __call__(self, config, words, tags):
+        """Hashed feature ids for config."""
+        mask = self.mask
+        return [crc32(f.encode("utf-8")) & mask for f in self.strings(config, words, tags)]
+
+    def arc_strings(self, config, words, tags, action, head, dep):
+        """Feature strings for labelling the arc head -> dep added by action."""
+        lc, rc = config.outer_labels(dep)
+        hw, ht, dw, dt = words[head], tags[head], words[dep], tags[dep]
+        dist = dep - head
+        return [
+            "bias",
+            "act=" + str(action),
+            "hw=" + hw, "ht=" + ht, "dw=" + dw, "dt=" + dt,
+            "ht_dt=" + ht + "/" + dt, "hw_dt=" + hw + "/" + dt, "ht_dw=" + ht + "/" + dw,
+            "dir_dist=" + str(max(-5, min(dist, 5))),
+            "dlc=" + (NONE if lc is None else lc), "drc=" + (NONE if rc is None else rc),
+        ]
+
+    def arc_features(self, config, words, tags, action, head, dep):
+        """Hashed feature ids for labelling an arc."""
+        mask = self.mask
+        return [crc32(f.encode("utf-8")) & mask for f in self.arc_strings(config, words, tags, action, head, dep)]
@@ -0,0 +1,65 @@
+"""Minimal NumPy .npy/.npz reader and writer using only the standard library.
+
+Arrays are `array.array` objects; the files load with numpy.load() as
+ordinary 1-D arrays, so training code can use NumPy/SciPy without this
+project depending on them.
+"""
+
+import ast
+import struct
+import sys
+import zipfile
+from array import array
+
+MAGIC = b"\x93NUMPY"
+_ORDER = "<" if sys.byteorder == "little" else ">"
+
+# array typecode -> NumPy dtype descriptor (without byte order)
+_DESCR = {"b": "i1", "B": "u1", "h": "i2", "H": "u2", "i": "i4", "I": "u4",
+          "l": "i8", "q": "i8", "Q": "u8", "f": "f4", "d": "f8"}
+_TYPECODE = {"i1": "b", "u1": "B", "i2": "h", "u2": "H", "i4": "i", "u4": "I",
+             "i8": "q", "u8": "Q", "f4": "f", "f8": "d"}
+
+
+def npy_bytes(arr):
+    """Serialize a 1-D array.array in .npy format (version 1.0)."""
+    size = array(arr.typecode).itemsize
+    descr = ("|" if size == 1 else _ORDER) + _DESCR[arr.typecode]
+    header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': ({len(arr)},), }}"
+    # Pad so the data starts on a 64-byte boundary; the header ends in '\n'
+    pad = -(len(MAGIC) + 2 + 2 + len(header) + 1) % 64
+    header = (header + " " * pad + "\n").encode("latin1")
+    return MAGIC + b"\x01\x00" + struct.pack("<H", len(header)) + header + arr.tobytes()
+
+
+def parse_npy(data):
+    """Inverse of npy_bytes for 1-D arrays of the supported dtypes."""
+    if data[:6] != MAGIC:
+        raise ValueError("not a .npy file")
+    major = data[6]
+    if major == 1:
+        (hlen,), start = struct.unpack_from("<H", data, 8), 10
+    else:
+        (hlen,), start = struct.unpack_from("<I", data, 8), 12
+    header = ast.literal_eval(data[start:start + hlen].decode("latin1"))
+    descr = header["descr"]
+    if header["fortran_order"] or len(header["shape"]) != 1 or descr[1:] not in _TYPECODE:
+        raise ValueError(f"unsupported array: {header}")
+    arr = array(_TYPECODE[descr[1:]])
+    arr.frombytes(data[start + hlen:])
+    if descr[0] not in ("|", "=", _ORDER):
+        arr.byteswap()
+    return arr
+
+
+def save_npz(path, **arrays):
+    """Write arrays to an uncompressed .npz archive (numpy.load compatible)."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as zf:
+        for name, arr in arrays.items():
+            zf.writestr(name + ".npy", npy_bytes(arr))
+
+
+def load_npz(path):
+    """Read every array of an .npz archive into a dict of array.array."""
+    with zipfile.ZipFile(path) as zf:
+        return {name[:-4]: parse_npy(zf.read(name)) for name in zf.namelist() if name.endswith(".npy")}
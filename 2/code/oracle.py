@@ -1,27 +1,27 @@
+import json
 import sys
+from itertools import chain
+
+from profiling import Profile
+from readers import read_corpus, read_stdin
+from systems import SYSTEMS, derive, get_system
 
 SH = 0; RE = 1; RA = 2; LA = 3;
 
 # Default to arc-eager so importing this module works.
-import arc_eager as _default_sys
-system_transition = _default_sys.transition
-system_oracle = _default_sys.oracle
 system_name = "arc-eager"
+system_module = get_system(system_name)
+system_transition = system_module.transition
+system_oracle = system_module.oracle
+tab_format = False
 
 labels = ["nsubj", "csubj", "nsubjpass", "csubjpass", "dobj", "iobj", "ccomp", "xcomp", "nmod", "advcl", "advmod", "neg", "aux", "auxpass", "cop", "mark", "discourse", "vocative", "expl", "nummod", "acl", "amod", "appos", "det", "case", "compound", "mwe", "goeswith", "name", "foreign", "conj", "cc", "punct", "list", "parataxis", "remnant", "dislocated", "reparandum", "root", "dep", "nmod:npmod", "nmod:tmod", "nmod:poss", "acl:relcl", "cc:preconj", "compound:prt"]
 
-def read_sentences():
-    sentence = []
-    sentences = []
-    for line in sys.stdin:
-        line = line.strip()
-        if not line:
-            sentences.append(sentence)
-            sentence = []
-        elif line[0] != "#":
-            token = line.split("\t")
-            sentence.append(token)
-    return(sentences)
+def read_sentences(paths=()):
+    # Streams the given corpora, or stdin, one sentence at a time (see readers)
+    if paths:
+        return chain.from_iterable(read_corpus(path) for path in paths)
+    return read_stdin()
 
 def attach_orphans(arcs, n):
     attached = []
@@ -31,23 +31,56 @@ def attach_orphans(arcs, n):
         if not i in attached:
             arcs.append((0, i, "root"))
 
-def print_tab(arcs, words, tags):
-    hs = {}
-    ls = {}
+def render_tab(arcs, words, tags):
+    """One WORD<TAB>POS<TAB>HEAD<TAB>LABEL line per token, then a blank line."""
+    n = len(words)
+    hs = [None] * n
+    ls = [None] * n
     for (h, d, l) in arcs:
         hs[d] = h
         ls[d] = l
-    for i in range(1, len(words)):
-        print("\t".join([words[i], tags[i], str(hs[i]), ls[i]]))
-    print()
-        
-def print_tree(root, arcs, words, indent):
+    lines = ["\t".join([words[i], tags[i], str(hs[i]), ls[i]]) for i in range(1, n)]
+    lines.append("")
+    return "\n".join(lines) + "\n"
+
+def children_index(arcs, n):
+    """children[h]: (dependent, label) pairs of head h, sorted."""
+    children = [[] for _ in range(n)]
+    for (h, d, l) in arcs:
+        children[h].append((d, l))
+    for c in children:
+        c.sort()
+    return children
+
+def render_tree(arcs, words, root=0, indent=""):
+    """Indented label(head_i, dep_j) lines for the subtree under root.
+
+    Walks a head -> children index with an explicit stack instead of
+    recursion, so deep trees are fine, and prints every arc whatever its
+    label.
+    """
+    lines = []
     if root == 0:
-        print(" ".join(words[1:]))
-    children = [(root, i, l) for i in range(len(words)) for l in labels if (root, i, l) in arcs]
-    for (h, d, l) in sorted(children):
-        print(indent + l + "(" + words[h] + "_" + str(h) + ", " + words[d] + "_" + str(d) + ")")
-        print_tree(d, arcs, words, indent + "  ")
+        lines.append(" ".join(words[1:]))
+    children = children_index(arcs, len(words))
+    expanded = {root}
+    # Pending (head, dep, label, indent), pushed in reverse so the first child pops first
+    todo = [(root, d, l, indent) for (d, l) in reversed(children[root])]
+    while todo:
+        h, d, l, ind = todo.pop()
+        lines.append(ind + l + "(" + words[h] + "_" + str(h) + ", " + words[d] + "_" + str(d) + ")")
+        if d in expanded:
+            continue
+        expanded.add(d)
+        ind += "  "
+        todo.extend((d, c, cl, ind) for (c, cl) in reversed(children[d]))
+    return "".join(line + "\n" for line in lines)
+
+def print_tab(arcs, words, tags):
+    sys.stdout.write(render_tab(arcs, words, tags))
+
+def print_tree(root, arcs, words, indent):
+    sys.stdout.write(render_tree(arcs, words, root, indent))
 
 def transition(trans, stack, buffer, arcs):
     # Backwards-compatible wrapper around the selected transition system.
@@ -57,39 +90,40 @@ def oracle(stack, buffer, heads, labels, arcs):
     # Backwards-compatible wrapper around the selected oracle.
     return system_oracle(stack, buffer, heads, labels, arcs)
 
-def parse(sentence):
-    sentence.insert(0, ("root", "_", "0", "_"))
-    words = [sentence[i][0] for i in range(len(sentence))]
-    tags = [sentence[i][1] for i in range(len(sentence))]
-    heads = [int(sentence[i][2]) for i in range(len(sentence))]
-    labels = [sentence[i][3] for i in range(len(sentence))]
-    stack = [0]
-    buffer = [x for x in range(1, len(words))]
-    arcs = []
-
-    max_steps = 10 * (len(words) + 1) ** 2
-    steps = 0
-    if system_name == "arc-standard":
-        while (buffer or len(stack) > 1) and steps < max_steps:
-            trans = system_oracle(stack, buffer, heads, labels, arcs)
-            prev = (tuple(stack), tuple(buffer), len(arcs))
-            stack, buffer, arcs = system_transition(trans, stack, buffer, arcs)
-            if (tuple(stack), tuple(buffer), len(arcs)) == prev:
-                break
-            steps += 1
-    else:
-        while buffer and steps < max_steps:
-            trans = system_oracle(stack, buffer, heads, labels, arcs)
-            prev = (tuple(stack), tuple(buffer), len(arcs))
-            stack, buffer, arcs = system_transition(trans, stack, buffer, arcs)
-            if (tuple(stack), tuple(buffer), len(arcs)) == prev:
-                break
-            steps += 1
+def render(sentence, system_name="arc-eager", tab_format=False, profile=None):
+    """Oracle parse of one sentence (token rows), rendered as text.
+
+    Reentrant: depends only on its arguments and leaves sentence unchanged
+    (apart from recording the run in profile, a profiling.Profile, if given).
+    """
+    rows = [("root", "_", "0", "_")] + list(sentence)
+    words = [row[0] for row in rows]
+    tags = [row[1] for row in rows]
+    heads = [int(row[2]) for row in rows]
+    gold_labels = [row[3] for row in rows]
+    arcs = derive(get_system(system_name), heads, gold_labels, profile).arcs
     attach_orphans(arcs, len(words))
     if tab_format:
-        print_tab(arcs, words, tags)
-    else:
-        print_tree(0, arcs, words, "")
+        return render_tab(arcs, words, tags)
+    return render_tree(arcs, words)
+
+def write_all(chunks, out, buffer_size=1 << 16):
+    """Write text chunks to out in batches of about buffer_size characters."""
+    pending = []
+    size = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        size += len(chunk)
+        if size >= buffer_size:
+            out.write("".join(pending))
+            pending = []
+            size = 0
+    if pending:
+        out.write("".join(pending))
+
+def parse(sentence):
+    sentence.insert(0, ("root", "_", "0", "_"))
+    sys.stdout.write(render(sentence[1:], system_name, tab_format))
 
 if __name__ == "__main__":
     # CLI (keeps assignment-required usage working):
@@ -97,19 +131,32 @@ if __name__ == "__main__":
     #   python3 oracle.py tab < example.tab
     # Extra credit:
     #   python3 oracle.py tab arc-standard < example.tab
-    args = set(sys.argv[1:])
+    # Input can also be given as files/directories (.tab or CoNLL):
+    #   python3 oracle.py tab path/to/HDTB/.../Development
+    # Profiling counters (JSON to PATH, summary to stderr):
+    #   python3 oracle.py tab --profile PATH < example.tab
+    argv = sys.argv[1:]
+    profile_path = None
+    if "--profile" in argv:
+        i = argv.index("--profile")
+        if i + 1 >= len(argv):
+            sys.exit("oracle.py: --profile needs a PATH")
+        profile_path = argv[i + 1]
+        del argv[i:i + 2]
+    args = set(argv)
     tab_format = "tab" in args
 
-    system_name = "arc-standard" if ("arc-standard" in args or "arc_standard" in args) else "arc-eager"
-
-    if system_name == "arc-standard":
-        import arc_standard as _sys
-        system_transition = _sys.transition
-        system_oracle = _sys.oracle
-    else:
-        import arc_eager as _sys
-        system_transition = _sys.transition
-        system_oracle = _sys.oracle
+    # Any registered system name (e.g. arc-standard or arc_standard) selects it
+    chosen = [a for a in argv if a.replace("_", "-") in SYSTEMS]
+    system_name = chosen[0].replace("_", "-") if chosen else "arc-eager"
+    system_module = get_system(system_name)
+    system_transition = system_module.transition
+    system_oracle = system_module.oracle
 
-    for sentence in read_sentences():
-        parse(sentence)
+    profile = Profile(system_name) if profile_path else None
+    paths = [a for a in argv if a != "tab" and a not in chosen]
+    write_all((render(sentence, system_name, tab_format, profile) for sentence in read_sentences(paths)), sys.stdout)
+    if profile is not None:
+        print(profile.summary(), file=sys.stderr)
+        with open(profile_path, "w", encoding="utf-8") as f:
+            json.dump(profile.report(), f, indent=1)
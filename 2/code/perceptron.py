@@ -0,0 +1,279 @@
+import argparse
+import json
+import random
+import sys
+import time
+from array import array
+
+from beam import beam_search
+from configuration import Configuration
+from extract_features import sentence_columns
+from features import DEFAULT_BITS, FeatureExtractor
+from npy import load_npz, save_npz
+from readers import read_corpus, read_stdin
+from systems import SYSTEMS, get_system, oracle_steps, replay_steps
+from transition_cache import TransitionCache
+
+
+class AveragedPerceptron:
+    """Multi-class averaged perceptron over hashed sparse features.
+
+    Weights live in one flat array('d'): the K class weights of feature f
+    are weights[offsets[f]:offsets[f] + K]. Rows are allocated the first
+    time a feature takes part in an update, so unseen features cost nothing.
+    Scoring adds one K-wide row per feature, so K should stay small.
+    """
+
+    def __init__(self, n_classes):
+        self.n_classes = n_classes
+        self.offsets = {}
+        self.weights = array("d")
+        # Averaging state: running sum of each weight over time and the
+        # example count at which that weight last changed
+        self._totals = array("d")
+        self._stamps = array("q")
+        self.examples = 0
+
+    def scores(self, feature_ids):
+        K = self.n_classes
+        weights = self.weights
+        offsets = self.offsets
+        rows = [weights[off:off + K] for off in map(offsets.get, feature_ids) if off is not None]
+        if not rows:
+            return [0.0] * K
+        # Column sums: one pass over the rows instead of one list per feature
+        return list(map(sum, zip(*rows)))
+
+    def predict(self, feature_ids, candidates=None):
+        """Highest-scoring class, among candidates if given (first one wins ties)."""
+        scores = self.scores(feature_ids)
+        if candidates is None:
+            candidates = range(self.n_classes)
+        return max(candidates, key=scores.__getitem__)
+
+    def _row(self, f):
+        off = self.offsets.get(f)
+        if off is None:
+            off = len(self.weights)
+            self.offsets[f] = off
+            zeros = bytes(8 * self.n_classes)
+            self.weights.frombytes(zeros)
+            self._totals.frombytes(zeros)
+            self._stamps.frombytes(zeros)
+        return off
+
+    def update(self, feature_ids, gold, guess):
+        """Count one training example; move weights toward gold if guess was wrong."""
+        self.examples += 1
+        if gold == guess:
+            return
+        now = self.examples
+        weights, totals, stamps = self.weights, self._totals, self._stamps
+        for f in feature_ids:
+            off = self._row(f)
+            for c, delta in ((gold, 1.0), (guess, -1.0)):
+                i = off + c
+                totals[i] += (now - stamps[i]) * weights[i]
+                stamps[i] = now
+                weights[i] += delta
+
+    def average(self):
+        """Replace the weights by their average over all training examples."""
+        now = self.examples
+        if not now:
+            return
+        weights, totals, stamps = self.weights, self._totals, self._stamps
+        for i in range(len(weights)):
+            weights[i] = (totals[i] + (now - stamps[i]) * weights[i]) / now
+        self._totals = array("d")
+        self._stamps = array("q")
+
+    def feature_array(self):
+        """Feature ids in row order, so row i is weights[i*K:(i+1)*K]."""
+        return array("i", sorted(self.offsets, key=self.offsets.get))
+
+    @classmethod
+    def from_arrays(cls, n_classes, features, weights):
+        model = cls(n_classes)
+        model.weights = weights
+        model.offsets = {f: i * n_classes for i, f in enumerate(features)}
+        return model
+
+
+class GreedyParser:
+    """Greedy transition parser driven by two averaged perceptrons.
+
+    The action model picks among the system's legal actions; for actions
+    that add an arc, the label model then picks a label from features of
+    the head and dependent. Factoring the decision this way keeps each
+    score vector short (a handful of actions, then the labels). Parsing
+    takes at most 2n transitions, so it is linear in sentence length.
+    """
+
+    def __init__(self, system_name, labels, action_model, label_model, extractor):
+        self.system_name = system_name
+        self.system = get_system(system_name)
+        self.labels = labels
+        self.action_model = action_model
+        self.label_model = label_model
+        self.extractor = extractor
+
+    def next_transition(self, config, words, tags):
+        """Predicted (action, label) for config, or None if nothing is legal."""
+        system = self.system
+        legal = system.legal_actions(config)
+        if not legal:
+            return None
+        action = self.action_model.predict(self.extractor(config, words, tags), legal)
+        arc = system.arc(action, config)
+        if arc is None:
+            return action, "_"
+        label_ids = self.extractor.arc_features(config, words, tags, action, *arc)
+        return action, self.labels[self.label_model.predict(label_ids)]
+
+    def parse(self, words, tags, beam=1):
+        """Return the Configuration after parsing; words/tags include ROOT at 0.
+
+        With beam > 1 the transitions are chosen by beam search instead of
+        greedily (see beam.beam_search).
+        """
+        if beam > 1:
+            return beam_search(self, words, tags, beam).to_configuration()
+        system = self.system
+        config = Configuration(len(words))
+        while not system.is_terminal(config):
+            trans = self.next_transition(config, words, tags)
+            if trans is None or not system.apply(trans, config):
+                break
+        return config
+
+    def save(self, path):
+        meta = {
+            "system": self.system_name,
+            "bits": self.extractor.bits,
+            "actions": self.action_model.n_classes,
+            "labels": self.labels,
+            "examples": self.action_model.examples,
+        }
+        save_npz(path,
+                 action_features=self.action_model.feature_array(), action_weights=self.action_model.weights,
+                 label_features=self.label_model.feature_array(), label_weights=self.label_model.weights,
+                 meta=array("B", json.dumps(meta, ensure_ascii=False).encode("utf-8")))
+
+    @classmethod
+    def load(cls, path):
+        arrays = load_npz(path)
+        meta = json.loads(arrays["meta"].tobytes().decode("utf-8"))
+        action_model = AveragedPerceptron.from_arrays(meta["actions"], arrays["action_features"],
+                                                      arrays["action_weights"])
+        label_model = AveragedPerceptron.from_arrays(len(meta["labels"]), arrays["label_features"],
+                                                     arrays["label_weights"])
+        action_model.examples = meta["examples"]
+        return cls(meta["system"], meta["labels"], action_model, label_model, FeatureExtractor(meta["bits"]))
+
+
+def oracle_examples(sentences, system, extractor, label_index, cache=None):
+    """Training examples for every oracle transition.
+
+    Each is (action features, gold action, legal actions, label features,
+    gold label id); the label entries are None for transitions without an
+    arc. label_index maps labels to ids and is extended with new labels.
+    With a transition_cache.TransitionCache, cached transitions are replayed.
+    """
+    examples = []
+    for sentence in sentences:
+        words, tags, gold_heads, gold_labels = sentence_columns(sentence)
+        config = Configuration(len(words))
+        if cache is None:
+            steps = oracle_steps(system, gold_heads, gold_labels, config)
+        else:
+            steps = replay_steps(system, cache.transitions(sentence, gold_heads, gold_labels), config)
+        for config, (action, label) in steps:
+            arc = system.arc(action, config)
+            if arc is None:
+                label_ids = label_id = None
+            else:
+                label_ids = extractor.arc_features(config, words, tags, action, *arc)
+                label_id = label_index.setdefault(label, len(label_index))
+            examples.append((extractor(config, words, tags), action, system.legal_actions(config),
+                             label_ids, label_id))
+    return examples
+
+
+def train(sentences, system_name, epochs=5, bits=DEFAULT_BITS, seed=0, log=None, cache=None):
+    """Train a GreedyParser from the static oracle on gold sentences."""
+    system = get_system(system_name)
+    extractor = FeatureExtractor(bits)
+    label_index = {}
+    examples = oracle_examples(sentences, system, extractor, label_index, cache)
+    action_model = AveragedPerceptron(len(system.ACTION_NAMES))
+    label_model = AveragedPerceptron(len(label_index))
+
+    rng = random.Random(seed)
+    for epoch in range(1, epochs + 1):
+        correct = 0
+        rng.shuffle(examples)
+        for action_ids, action, legal, label_ids, label_id in examples:
+            # The oracle may fall back to an action outside legal_actions
+            guess = action_model.predict(action_ids, legal if action in legal else legal + [action])
+            action_model.update(action_ids, action, guess)
+            ok = guess == action
+            if label_ids is not None:
+                label_guess = label_model.predict(label_ids)
+                label_model.update(label_ids, label_id, label_guess)
+                ok = ok and label_guess == label_id
+            correct += ok
+        if log:
+            log(f"epoch {epoch}: {correct}/{len(examples)} oracle transitions predicted "
+                f"({correct / len(examples) if examples else 0:.4f})")
+    action_model.average()
+    label_model.average()
+    labels = sorted(label_index, key=label_index.get)
+    return GreedyParser(system_name, labels, action_model, label_model, extractor)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Averaged-perceptron greedy transition parser.")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    tr = sub.add_parser("train", help="Train a model from a gold corpus.")
+    tr.add_argument("tab_file", help="Corpus to read: a .tab or CoNLL .dat/.conll file, or a directory of them.")
+    tr.add_argument("model", help="Output model file (.npz).")
+    tr.add_argument("--system", choices=sorted(SYSTEMS), default="arc-eager")
+    tr.add_argument("--epochs", type=int, default=5)
+    tr.add_argument("--bits", type=int, default=DEFAULT_BITS, help="Hash features into 2**BITS ids.")
+    tr.add_argument("--seed", type=int, default=0)
+    tr.add_argument("--cache", metavar="DIR",
+                    help="Replay oracle transitions cached in DIR (see transition_cache.py), adding missing ones.")
+
+    pa = sub.add_parser("parse", help="Parse WORD<TAB>POS[...] sentences from stdin to .tab on stdout.")
+    pa.add_argument("model")
+    pa.add_argument("--beam", type=int, default=1, help="Beam width (1 = greedy).")
+
+    args = ap.parse_args()
+    if args.command == "train":
+        start = time.perf_counter()
+        log = lambda msg: print(msg, file=sys.stderr)
+        cache = TransitionCache(args.cache, args.system) if args.cache else None
+        parser = train(read_corpus(args.tab_file), args.system, args.epochs, args.bits, args.seed, log, cache)
+        parser.save(args.model)
+        if cache is not None:
+            cache.flush()
+            log(cache.summary())
+        log(f"Trained on {parser.action_model.examples // max(args.epochs, 1)} transitions, "
+            f"{len(parser.labels)} labels in {time.perf_counter() - start:.1f}s")
+    else:
+        parser = GreedyParser.load(args.model)
+        for sentence in read_stdin():
+            words = ["root"] + [tok[0] for tok in sentence]
+            tags = ["_"] + [tok[1] if len(tok) > 1 else "_" for tok in sentence]
+            config = parser.parse(words, tags, args.beam)
+            for i in range(1, len(words)):
+                head = config.heads[i]
+                label = config.labels[i] if head >= 0 else "root"
+                print("\t".join([words[i], tags[i], str(max(head, 0)), label]))
+            print()
+
+
+if __name__ == "__main__":
+    main()
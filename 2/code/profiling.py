@@ -0,0 +1,146 @@
+import time
+from collections import Counter
+
+from systems import get_system
+
+
+class Profile:
+    """Counters for oracle-driven parsing, per sentence and in aggregate.
+
+    Profile.oracle_steps is a drop-in replacement for systems.oracle_steps
+    that records, for each sentence:
+    - the number of transitions of each type
+    - the steps taken against the 2n bound (n tokens without ROOT)
+    - time spent choosing transitions (oracle) and applying them (apply)
+    - whether it stopped because a transition did not apply (a stall)
+    - how often the oracle's fallback branches fired (arc-standard's
+      buffer-empty RA/LA/RA-dep), read from the oracle's `fallbacks` Counter
+
+    Each step costs four clock reads and a list increment, so the
+    profile can stay on for whole corpora. Per-sentence records are kept as
+    tuples unless keep_sentences is False.
+    """
+
+    def __init__(self, system_name, keep_sentences=True):
+        self.system_name = system_name
+        self.action_names = dict(get_system(system_name).ACTION_NAMES)
+        self.sentences = 0
+        self.tokens = 0
+        self.steps = 0
+        self.bound = 0
+        self.over_bound = 0
+        self.stalls = 0
+        self.transitions = [0] * (max(self.action_names, default=-1) + 1)
+        self.fallbacks = Counter()
+        self.oracle_seconds = 0.0
+        self.apply_seconds = 0.0
+        # (tokens, steps, transition counts, stalled, fallbacks, oracle seconds, apply seconds)
+        self.records = [] if keep_sentences else None
+
+    def oracle_steps(self, system, gold_heads, gold_labels, config):
+        """Same as systems.oracle_steps, recording one sentence."""
+        next_transition = system.Oracle(gold_heads, gold_labels)
+        apply = system.apply
+        is_terminal = system.is_terminal
+        clock = time.perf_counter
+        counts = [0] * len(self.transitions)
+        oracle_seconds = apply_seconds = 0.0
+        stalled = False
+        try:
+            while not is_terminal(config):
+                t0 = clock()
+                trans = next_transition(config)
+                oracle_seconds += clock() - t0
+                yield config, trans
+                t0 = clock()
+                applied = apply(trans, config)
+                apply_seconds += clock() - t0
+                if not applied:
+                    stalled = True
+                    return
+                counts[trans[0]] += 1
+        finally:
+            fallbacks = getattr(next_transition, "fallbacks", None)
+            self._record(len(gold_heads) - 1, counts, stalled, fallbacks, oracle_seconds, apply_seconds)
+
+    def _record(self, tokens, counts, stalled, fallbacks, oracle_seconds, apply_seconds):
+        steps = sum(counts)
+        self.sentences += 1
+        self.tokens += tokens
+        self.steps += steps
+        self.bound += 2 * tokens
+        self.over_bound += steps > 2 * tokens
+        self.stalls += stalled
+        self.transitions = [a + b for a, b in zip(self.transitions, counts)]
+        n_fallbacks = 0
+        if fallbacks:
+            self.fallbacks.update(fallbacks)
+            n_fallbacks = sum(fallbacks.values())
+        self.oracle_seconds += oracle_seconds
+        self.apply_seconds += apply_seconds
+        if self.records is not None:
+            self.records.append((tokens, steps, counts, stalled, n_fallbacks, oracle_seconds, apply_seconds))
+
+    def merge(self, other):
+        """Add another Profile's sentences after this one's (e.g. from a worker)."""
+        self.sentences += other.sentences
+        self.tokens += other.tokens
+        self.steps += other.steps
+        self.bound += other.bound
+        self.over_bound += other.over_bound
+        self.stalls += other.stalls
+        self.transitions = [a + b for a, b in zip(self.transitions, other.transitions)]
+        self.fallbacks.update(other.fallbacks)
+        self.oracle_seconds += other.oracle_seconds
+        self.apply_seconds += other.apply_seconds
+        if self.records is not None and other.records is not None:
+            self.records.extend(other.records)
+
+    def _names(self, counts):
+        return {self.action_names[code]: count for code, count in enumerate(counts) if code in self.action_names}
+
+    def report(self):
+        """Aggregate counters (and per-sentence records, if kept) as a JSON-serializable dict."""
+        report = {
+            "system": self.system_name,
+            "sentences": self.sentences,
+            "tokens": self.tokens,
+            "steps": self.steps,
+            "step_bound": self.bound,
+            "sentences_over_bound": self.over_bound,
+            "transitions": self._names(self.transitions),
+            "stalls": self.stalls,
+            "fallbacks": dict(self.fallbacks),
+            "oracle_seconds": round(self.oracle_seconds, 6),
+            "apply_seconds": round(self.apply_seconds, 6),
+        }
+        if self.records is not None:
+            report["per_sentence"] = [
+                {
+                    "sentence": i,
+                    "tokens": tokens,
+                    "steps": steps,
+                    "step_bound": 2 * tokens,
+                    "transitions": self._names(counts),
+                    "stalled": stalled,
+                    "fallbacks": n_fallbacks,
+                    "oracle_us": round(oracle_seconds * 1e6, 1),
+                    "apply_us": round(apply_seconds * 1e6, 1),
+                }
+                for i, (tokens, steps, counts, stalled, n_fallbacks, oracle_seconds, apply_seconds)
+                in enumerate(self.records)
+            ]
+        return report
+
+    def summary(self):
+        """Short text version of the aggregate counters."""
+        transitions = ", ".join(f"{name}={count}" for name, count in self._names(self.transitions).items())
+        fallbacks = ", ".join(f"{name}={count}" for name, count in sorted(self.fallbacks.items())) or "none"
+        return "\n".join([
+            f"Profile: {self.sentences} sentences, {self.steps} steps (bound {self.bound}, "
+            f"{self.over_bound} sentence(s) over)",
+            f"  transitions: {transitions}",
+            f"  stalls (transition did not apply): {self.stalls}",
+            f"  oracle fallbacks: {fallbacks}",
+            f"  time: oracle {self.oracle_seconds:.3f}s, apply {self.apply_seconds:.3f}s",
+        ])
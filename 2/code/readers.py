@@ -0,0 +1,129 @@
+import os
+import sys
+from itertools import chain
+
+
+def iter_sentences(lines):
+    """Yield sentences (lists of tab-split token rows) from an iterable of lines.
+
+    Sentences are separated by blank lines; runs of blank lines do not produce
+    empty sentences, lines starting with '#' are skipped, and a final sentence
+    without a trailing blank line is still yielded. Only the current sentence
+    is held in memory.
+    """
+    sentence = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            if sentence:
+                yield sentence
+                sentence = []
+        elif line[0] != "#":
+            sentence.append(line.split("\t"))
+    if sentence:
+        yield sentence
+
+
+def iter_conll_sentences(lines):
+    """Like iter_sentences, for 10-column CoNLL (.dat/.conll) input.
+
+    Each token row is projected to the .tab columns [WORD, POS, HEAD, DEPREL]
+    (CoNLL columns 2, 5, 7 and 8) as it is read. Rows with fewer than 8
+    columns and CoNLL-U multiword/empty-node rows (ids like 1-2 or 1.1) are
+    skipped.
+    """
+    sentence = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            if sentence:
+                yield sentence
+                sentence = []
+        elif line[0] != "#":
+            parts = line.split("\t")
+            if len(parts) >= 8 and parts[0].isdigit():
+                sentence.append([parts[1], parts[4], parts[6], parts[7]])
+    if sentence:
+        yield sentence
+
+
+# Sentence readers by file extension; each takes an iterable of lines
+READERS = {}
+
+
+def register(extension, reader):
+    READERS[extension] = reader
+
+
+register(".tab", iter_sentences)
+register(".dat", iter_conll_sentences)
+register(".conll", iter_conll_sentences)
+register(".conllu", iter_conll_sentences)
+
+
+def reader_for(path):
+    """The registered reader for path's extension (the .tab reader if none)."""
+    return READERS.get(os.path.splitext(path)[1].lower(), iter_sentences)
+
+
+def corpus_files(root):
+    """Files under directory root with a registered extension, in sorted path order."""
+    found = []
+    for dirpath, _, filenames in os.walk(root):
+        found.extend(os.path.join(dirpath, name) for name in filenames
+                     if os.path.splitext(name)[1].lower() in READERS)
+    return sorted(found)
+
+
+def read_tab_file(path):
+    """Stream the sentences of a .tab file."""
+    with open(path, "r", encoding="utf-8") as f:
+        yield from iter_sentences(f)
+
+
+def read_file(path):
+    """Stream the sentences of one file, choosing the reader by extension."""
+    reader = reader_for(path)
+    with open(path, "r", encoding="utf-8") as f:
+        yield from reader(f)
+
+
+def read_corpus(path):
+    """Stream [WORD, POS, HEAD, DEPREL] sentences from a file or a directory.
+
+    A directory is read recursively, file by file in sorted path order, so
+    e.g. an HDTB .../CoNLL/utf/news_articles_and_heritage/Development
+    directory can be used wherever a .tab file can.
+    """
+    if os.path.isdir(path):
+        for filepath in corpus_files(path):
+            yield from read_file(filepath)
+    else:
+        yield from read_file(path)
+
+
+def sniff(lines):
+    """(reader, lines) for a stream whose format is not known from a file name.
+
+    Looks at the first token row: 8 or more columns starting with a numeric
+    id means CoNLL, anything else .tab. The returned lines include the ones
+    looked at.
+    """
+    lines = iter(lines)
+    seen = []
+    reader = iter_sentences
+    for line in lines:
+        seen.append(line)
+        line = line.strip()
+        if line and line[0] != "#":
+            parts = line.split("\t")
+            if len(parts) >= 8 and parts[0].isdigit():
+                reader = iter_conll_sentences
+            break
+    return reader, chain(seen, lines)
+
+
+def read_stdin():
+    """Stream the sentences of standard input (.tab or CoNLL)."""
+    reader, lines = sniff(sys.stdin)
+    return reader(lines)
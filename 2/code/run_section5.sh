@@ -7,35 +7,19 @@ HINDI_DIR="$BASE_DIR/HDTB_pre_release_version-0.05/IntraChunk/CoNLL/utf/news_art
 DEV_DIR="$HINDI_DIR/Development"
 TEST_DIR="$HINDI_DIR/Testing"
 
-# Output files
-DEV_TAB="hindi_dev.tab"
-TEST_TAB="hindi_test.tab"
+# Worker processes per evaluation (override with JOBS=N ./run_section5.sh)
+JOBS="${JOBS:-$(nproc 2>/dev/null || echo 1)}"
 
-echo "======================================================="
-echo "Generating .tab files from Hindi Treebank..."
-echo "======================================================="
+for dir in "$DEV_DIR" "$TEST_DIR"; do
+    if [ ! -d "$dir" ]; then
+        echo "Error: directory not found at $dir"
+        exit 1
+    fi
+done
 
-# Convert Development Set
-if [ -d "$DEV_DIR" ]; then
-    echo "Converting Development Set..."
-    python3 convert_hindi_to_tab.py "$DEV_DIR" "$DEV_TAB"
-    echo "Done. Created $DEV_TAB"
-else
-    echo "Error: Development directory not found at $DEV_DIR"
-    exit 1
-fi
-
-# Convert Test Set
-if [ -d "$TEST_DIR" ]; then
-    echo "Converting Test Set..."
-    python3 convert_hindi_to_tab.py "$TEST_DIR" "$TEST_TAB"
-    echo "Done. Created $TEST_TAB"
-else
-    echo "Error: Test directory not found at $TEST_DIR"
-    exit 1
-fi
+# evaluate.py reads the CoNLL .dat files under each directory directly, so no
+# .tab files are generated (convert_hindi_to_tab.py still makes them on request)
 
-echo ""
 echo "======================================================="
 echo "Running Evaluation (Section 5)"
 echo "======================================================="
@@ -43,18 +27,18 @@ echo "======================================================="
 echo ""
 echo "--- ARC-EAGER Evaluation ---"
 echo "Development Set:"
-python3 evaluate.py "$DEV_TAB" --system arc-eager
+python3 evaluate.py "$DEV_DIR" --system arc-eager --jobs "$JOBS"
 echo ""
 echo "Test Set:"
-python3 evaluate.py "$TEST_TAB" --system arc-eager
+python3 evaluate.py "$TEST_DIR" --system arc-eager --jobs "$JOBS"
 
 echo ""
 echo "--- ARC-STANDARD Evaluation ---"
 echo "Development Set:"
-python3 evaluate.py "$DEV_TAB" --system arc-standard
+python3 evaluate.py "$DEV_DIR" --system arc-standard --jobs "$JOBS"
 echo ""
 echo "Test Set:"
-python3 evaluate.py "$TEST_TAB" --system arc-standard
+python3 evaluate.py "$TEST_DIR" --system arc-standard --jobs "$JOBS"
 
 echo ""
 echo "======================================================="
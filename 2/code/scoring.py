@@ -0,0 +1,202 @@
+import argparse
+import json
+from array import array
+from collections import Counter
+from itertools import compress, repeat
+from operator import and_, eq, sub
+
+# Bucket upper bounds (inclusive) and names for the grouped breakdowns
+LENGTH_BUCKETS = ((10, "1-10"), (20, "11-20"), (30, "21-30"), (40, "31-40"), (None, "41+"))
+DISTANCE_BUCKETS = ((1, "1"), (2, "2"), (6, "3-6"), (None, "7+"))
+BREAKDOWNS = ("label", "pos", "length", "distance", "direction")
+
+
+class Vocab(dict):
+    """String -> dense id, assigning ids on first lookup."""
+
+    def __missing__(self, key):
+        self[key] = value = len(self)
+        return value
+
+    def names(self):
+        return sorted(self, key=self.get)
+
+
+def bucket(value, buckets):
+    for bound, name in buckets:
+        if bound is None or value <= bound:
+            return name
+
+
+class Scores:
+    """Gold and predicted heads/labels of many sentences as flat columns.
+
+    Sentences are appended with add() as whole slices (array.extend), and
+    every statistic is computed over the full columns at once: equality
+    masks with map(), then grouped counts with Counter over the category
+    column and compress(category, mask), a bincount-style reduction that
+    runs in C. Labels and tags are stored as ids of the Vocabs.
+    """
+
+    def __init__(self):
+        self.sentences = 0
+        self.positions = array("i")
+        self.lengths = array("i")
+        self.gold_heads = array("i")
+        self.pred_heads = array("i")
+        self.gold_labels = array("i")
+        self.pred_labels = array("i")
+        self.tags = array("i")
+        self.label_ids = Vocab()
+        self.tag_ids = Vocab()
+
+    def __len__(self):
+        return len(self.gold_heads)
+
+    def add(self, parsed):
+        """Append one sentence from a parse_with_* result (ROOT at index 0)."""
+        n = len(parsed["words"]) - 1
+        label_id = self.label_ids.__getitem__
+        self.sentences += 1
+        self.positions.extend(range(1, n + 1))
+        self.lengths.extend(repeat(n, n))
+        self.gold_heads.extend(parsed["gold_heads"][1:])
+        self.pred_heads.extend(parsed["pred_heads"][1:])
+        self.gold_labels.extend(map(label_id, parsed["gold_labels"][1:]))
+        self.pred_labels.extend(map(label_id, parsed["pred_labels"][1:]))
+        self.tags.extend(map(self.tag_ids.__getitem__, parsed["tags"][1:]))
+
+    def merge(self, other):
+        """Append all sentences of another Scores (e.g. from a worker process)."""
+        labels = [self.label_ids[name] for name in other.label_ids.names()]
+        tags = [self.tag_ids[name] for name in other.tag_ids.names()]
+        self.sentences += other.sentences
+        self.positions.extend(other.positions)
+        self.lengths.extend(other.lengths)
+        self.gold_heads.extend(other.gold_heads)
+        self.pred_heads.extend(other.pred_heads)
+        self.gold_labels.extend(map(labels.__getitem__, other.gold_labels))
+        self.pred_labels.extend(map(labels.__getitem__, other.pred_labels))
+        self.tags.extend(map(tags.__getitem__, other.tags))
+
+    def masks(self):
+        """(uas, las): bytes with 1 where the head (and, for las, the label) is right."""
+        uas = bytes(map(eq, self.gold_heads, self.pred_heads))
+        las = bytes(map(and_, uas, map(eq, self.gold_labels, self.pred_labels)))
+        return uas, las
+
+    @staticmethod
+    def grouped(keys, uas, las, name_of=None):
+        """{category: [tokens, uas_ok, las_ok]} over a column of per-token keys.
+
+        Counts are taken per distinct key; name_of (if given) then maps keys to
+        category names and merges keys that share a name, e.g. into buckets.
+        """
+        total = Counter(keys)
+        uas_ok = Counter(compress(keys, uas))
+        las_ok = Counter(compress(keys, las))
+        groups = {}
+        for key, count in total.items():
+            name = name_of(key) if name_of else key
+            group = groups.setdefault(name, [0, 0, 0])
+            group[0] += count
+            group[1] += uas_ok[key]
+            group[2] += las_ok[key]
+        return groups
+
+    def breakdowns(self, uas, las):
+        labels = self.label_ids.names()
+        tags = self.tag_ids.names()
+        # Signed gold arc offset head - dependent, 0 for arcs from ROOT
+        offsets = array("i", map(sub, self.gold_heads, self.positions))
+        for i in compress(range(len(offsets)), map(eq, self.gold_heads, repeat(0))):
+            offsets[i] = 0
+        return {
+            "label": self.grouped(self.gold_labels, uas, las, labels.__getitem__),
+            "pos": self.grouped(self.tags, uas, las, tags.__getitem__),
+            "length": self.grouped(self.lengths, uas, las, lambda n: bucket(n, LENGTH_BUCKETS)),
+            "distance": self.grouped(offsets, uas, las,
+                                     lambda d: bucket(abs(d), DISTANCE_BUCKETS) if d else "root"),
+            # Side of the head the dependent is on
+            "direction": self.grouped(offsets, uas, las,
+                                      lambda d: "left" if d > 0 else "right" if d < 0 else "root"),
+        }
+
+    def report(self):
+        """Overall and per-category scores as a JSON-serializable dict."""
+        uas, las = self.masks()
+        tokens = len(self)
+        uas_ok = sum(uas)
+        las_ok = sum(las)
+        report = {"sentences": self.sentences}
+        report.update(entry(tokens, uas_ok, las_ok))
+        report["breakdowns"] = {
+            kind: {name: entry(*counts) for name, counts in sorted(groups.items(), key=category_order)}
+            for kind, groups in self.breakdowns(uas, las).items()
+        }
+        return report
+
+
+def entry(tokens, uas_ok, las_ok):
+    return {
+        "tokens": tokens,
+        "uas_ok": uas_ok,
+        "las_ok": las_ok,
+        "uas": round(uas_ok / tokens, 6) if tokens else 0.0,
+        "las": round(las_ok / tokens, 6) if tokens else 0.0,
+    }
+
+
+def category_order(item):
+    # Buckets in their natural order, other categories by size
+    name, counts = item
+    for order, (_, bucket_name) in enumerate(LENGTH_BUCKETS + DISTANCE_BUCKETS):
+        if name == bucket_name:
+            return (0, order, "")
+    return (1, -counts[0], name)
+
+
+def compare(reports, kind, names, min_tokens=0):
+    """Text table of one breakdown across several evaluate.py --json reports."""
+    categories = {}
+    for report in reports:
+        for name, scores in report["breakdowns"][kind].items():
+            categories[name] = max(categories.get(name, 0), scores["tokens"])
+    header = f"{kind:<16} {'tokens':>8}" + "".join(f" {n[:15] + ' UAS':>19} {n[:15] + ' LAS':>19}" for n in names)
+    lines = [header]
+    for name, tokens in sorted(categories.items(), key=lambda item: category_order((item[0], [item[1]]))):
+        if tokens < min_tokens:
+            continue
+        row = f"{name:<16} {tokens:>8}"
+        for report in reports:
+            scores = report["breakdowns"][kind].get(name)
+            if scores is None:
+                row += f" {'-':>19} {'-':>19}"
+            else:
+                row += f" {scores['uas']:>19.4f} {scores['las']:>19.4f}"
+        lines.append(row)
+    return "\n".join(lines)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare evaluate.py --json reports category by category.")
+    ap.add_argument("reports", nargs="+", help="JSON files written by evaluate.py --json.")
+    ap.add_argument("--by", choices=BREAKDOWNS, default="label", help="Breakdown to compare.")
+    ap.add_argument("--min-tokens", type=int, default=0, help="Hide categories with fewer tokens.")
+    args = ap.parse_args()
+
+    reports = []
+    for path in args.reports:
+        with open(path, "r", encoding="utf-8") as f:
+            reports.append(json.load(f))
+    names = [report.get("system", path) for report, path in zip(reports, args.reports)]
+    if len(set(names)) < len(names):
+        names = args.reports
+    for report, name in zip(reports, names):
+        print(f"{name}: {report['tokens']} tokens, UAS {report['uas']:.4f}, LAS {report['las']:.4f}")
+    print()
+    print(compare(reports, args.by, names, args.min_tokens))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import arc_eager
+import arc_standard
+from configuration import Configuration
+
+# Transition systems by name. A system is any object (usually a module) with
+#   apply(trans, config) -> bool   apply a transition, False if not applicable
+#   is_terminal(config) -> bool    whether parsing is finished
+#   Oracle(gold_heads, gold_labels) -> callable(config) -> transition
+#   legal_actions(config) -> list  actions a learned parser may take
+#   arc(action, config) -> (head, dep) or None  the arc an action would add
+#   successor(trans, state) -> state or None     apply() for a persistent beam.State
+#   VERSION: int                   bump when the oracle's output changes (keys transition_cache)
+SYSTEMS = {}
+
+
+def register(name, system):
+    SYSTEMS[name] = system
+
+
+def get_system(name):
+    """Look up a transition system; 'arc_standard' and 'arc-standard' are the same."""
+    system = SYSTEMS.get(name.replace("_", "-"))
+    if system is None:
+        raise ValueError(f"Unknown transition system: {name} (known: {', '.join(sorted(SYSTEMS))})")
+    return system
+
+
+register("arc-eager", arc_eager)
+register("arc-standard", arc_standard)
+
+
+def oracle_steps(system, gold_heads, gold_labels, config):
+    """Yield (config, transition) for each oracle step, then apply it.
+
+    The configuration is yielded before the transition is applied, so a
+    consumer can read it (e.g. to extract features) but must not modify it.
+    Stops when the configuration is terminal or a transition does not apply.
+    Every applied transition either consumes a buffer token or pops the
+    stack, so there are at most 2n steps.
+    """
+    next_transition = system.Oracle(gold_heads, gold_labels)
+    apply = system.apply
+    is_terminal = system.is_terminal
+    while not is_terminal(config):
+        trans = next_transition(config)
+        yield config, trans
+        if not apply(trans, config):
+            return
+
+
+def replay_steps(system, transitions, config):
+    """Like oracle_steps, for a recorded transition sequence (e.g. from a transition_cache)."""
+    apply = system.apply
+    for trans in transitions:
+        yield config, trans
+        if not apply(trans, config):
+            return
+
+
+def derive(system, gold_heads, gold_labels, profile=None, transitions=None):
+    """Run the system's static oracle from the initial configuration.
+
+    If a profiling.Profile is given, the run is recorded in it. If the
+    oracle's transitions are given (e.g. from a transition_cache), they are
+    replayed instead.
+    """
+    config = Configuration(len(gold_heads))
+    if transitions is not None:
+        steps = replay_steps(system, transitions, config)
+    elif profile is not None:
+        steps = profile.oracle_steps(system, gold_heads, gold_labels, config)
+    else:
+        steps = oracle_steps(system, gold_heads, gold_labels, config)
+    for _ in steps:
+        pass
+    return config
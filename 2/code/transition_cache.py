@@ -0,0 +1,217 @@
+"""Content-addressed cache of gold (oracle) transition sequences.
+
+A sentence's oracle derivation depends only on its gold columns and on the
+transition system, so it is stored under a hash of the (word, tag, head,
+label) rows plus the system's name and VERSION. Repeat evaluations and
+training runs replay the stored transitions with systems.replay_steps
+instead of calling the oracle.
+
+Entries live in append-only pack files in the cache directory. Each run
+that derives new sequences writes one new pack-*.pack file (atomically,
+via a temporary file), so parallel workers never write to the same file.
+A record is
+
+    magic b"GTS1" | key (16 bytes) | crc32 of payload | payload length
+    payload: steps, labels (uint32) | actions (uint8 each)
+             | label ids (uint16 each) | label names, utf-8, newline-joined
+
+Corrupt records (bad crc, truncated or malformed payload, unknown action
+codes) are detected when looked up, re-derived and written again; a later
+pack overrides an earlier one. Bump a system's VERSION when its oracle
+changes, so old entries are no longer found.
+"""
+
+import argparse
+import hashlib
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+from collections import Counter
+
+from configuration import Configuration
+from systems import get_system, oracle_steps
+
+MAGIC = b"GTS1"
+RECORD = struct.Struct("<4s16sII")
+COUNTS = struct.Struct("<II")
+# Label ids are stored little-endian
+_SWAP = sys.byteorder == "big"
+
+
+def sentence_key(system_name, version, sentence):
+    """16-byte key of one sentence's [WORD, POS, HEAD, DEPREL] rows for a system version."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{system_name}\0{version}\0".encode("utf-8"))
+    h.update("\n".join("\t".join(row[:4]) for row in sentence).encode("utf-8"))
+    return h.digest()
+
+
+def encode(transitions):
+    """Payload bytes for a list of (action, label) transitions."""
+    names = {}
+    actions = array("B", [action for action, _ in transitions])
+    label_ids = array("H", [names.setdefault(label, len(names)) for _, label in transitions])
+    if _SWAP:
+        label_ids.byteswap()
+    table = "\n".join(names).encode("utf-8")
+    return COUNTS.pack(len(transitions), len(names)) + actions.tobytes() + label_ids.tobytes() + table
+
+
+def decode(payload, action_codes):
+    """Inverse of encode; None if the payload is malformed."""
+    if len(payload) < COUNTS.size:
+        return None
+    n, n_labels = COUNTS.unpack_from(payload)
+    start = COUNTS.size
+    if len(payload) < start + 3 * n:
+        return None
+    actions = array("B")
+    actions.frombytes(payload[start:start + n])
+    label_ids = array("H")
+    label_ids.frombytes(payload[start + n:start + 3 * n])
+    if _SWAP:
+        label_ids.byteswap()
+    names = bytes(payload[start + 3 * n:]).decode("utf-8", "replace").split("\n") if n_labels else []
+    if len(names) != n_labels or not action_codes.issuperset(actions) or (n and max(label_ids) >= n_labels):
+        return None
+    return list(zip(actions, map(names.__getitem__, label_ids)))
+
+
+def pack_files(root):
+    """Pack files under root in the order they were written."""
+    return sorted(os.path.join(root, name) for name in os.listdir(root) if name.endswith(".pack"))
+
+
+def read_pack(path):
+    """Yield (key, crc, payload) records of one pack file, stopping at a truncated or unreadable record."""
+    with open(path, "rb") as f:
+        data = memoryview(f.read())
+    pos = 0
+    while pos + RECORD.size <= len(data):
+        magic, key, crc, size = RECORD.unpack_from(data, pos)
+        pos += RECORD.size
+        if magic != MAGIC or pos + size > len(data):
+            return
+        yield key, crc, data[pos:pos + size]
+        pos += size
+
+
+class TransitionCache:
+    """Oracle transition sequences of one system, stored under root.
+
+    transitions() returns a sentence's sequence, deriving and recording it
+    on a miss; call flush() to write the new entries. stats counts hits,
+    misses and corrupt entries (which are rebuilt).
+    """
+
+    def __init__(self, root, system_name):
+        self.root = root
+        self.system_name = system_name
+        self.system = get_system(system_name)
+        self.version = getattr(self.system, "VERSION", 0)
+        self.action_codes = set(self.system.ACTION_NAMES)
+        self.index = {}
+        self.pending = []
+        self.stats = Counter()
+        os.makedirs(root, exist_ok=True)
+        for path in pack_files(root):
+            for key, crc, payload in read_pack(path):
+                self.index[key] = (crc, payload)
+
+    def key(self, sentence):
+        return sentence_key(self.system_name, self.version, sentence)
+
+    def get(self, key):
+        """Stored transitions for key, or None if missing or corrupt."""
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+        crc, payload = entry
+        transitions = decode(payload, self.action_codes) if zlib.crc32(payload) == crc else None
+        if transitions is None:
+            self.stats["corrupt"] += 1
+            del self.index[key]
+        return transitions
+
+    def put(self, key, transitions):
+        payload = encode(transitions)
+        crc = zlib.crc32(payload)
+        self.index[key] = (crc, payload)
+        self.pending.append(RECORD.pack(MAGIC, key, crc, len(payload)) + payload)
+
+    def transitions(self, sentence, gold_heads, gold_labels):
+        """The oracle's transitions for sentence (token rows, without ROOT) and its gold columns."""
+        key = self.key(sentence)
+        transitions = self.get(key)
+        if transitions is not None:
+            self.stats["hits"] += 1
+            return transitions
+        self.stats["misses"] += 1
+        transitions = [trans for _, trans in
+                       oracle_steps(self.system, gold_heads, gold_labels, Configuration(len(gold_heads)))]
+        self.put(key, transitions)
+        return transitions
+
+    def flush(self):
+        """Write the entries added since the last flush as a new pack file."""
+        if not self.pending:
+            return
+        name = f"pack-{time.time_ns():020d}-{os.getpid()}"
+        tmp = os.path.join(self.root, name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.writelines(self.pending)
+        os.replace(tmp, os.path.join(self.root, name + ".pack"))
+        self.pending = []
+
+    def summary(self):
+        return (f"Cache: {self.stats['hits']} hits, {self.stats['misses']} misses "
+                f"({self.stats['corrupt']} corrupt entries rebuilt) in {self.root}")
+
+
+def compact(root):
+    """Rewrite all readable records of root into one pack file; returns (records, packs replaced).
+
+    Records that fail their crc are dropped; for repeated keys the latest
+    record is kept. Do not run while other processes write to root.
+    """
+    paths = pack_files(root)
+    records = {}
+    for path in paths:
+        for key, crc, payload in read_pack(path):
+            if zlib.crc32(payload) == crc:
+                records[key] = RECORD.pack(MAGIC, key, crc, len(payload)) + payload
+    name = f"pack-{time.time_ns():020d}-{os.getpid()}"
+    tmp = os.path.join(root, name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.writelines(records.values())
+    os.replace(tmp, os.path.join(root, name + ".pack"))
+    for path in paths:
+        os.remove(path)
+    return len(records), len(paths)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Inspect or compact a gold transition cache directory.")
+    ap.add_argument("cache_dir")
+    ap.add_argument("--compact", action="store_true", help="Merge all pack files into one.")
+    args = ap.parse_args()
+
+    if args.compact:
+        records, packs = compact(args.cache_dir)
+        print(f"Compacted {packs} pack(s) into one with {records} entries")
+    paths = pack_files(args.cache_dir)
+    keys = set()
+    corrupt = 0
+    for path in paths:
+        for key, crc, payload in read_pack(path):
+            keys.add(key)
+            corrupt += zlib.crc32(payload) != crc
+    size = sum(map(os.path.getsize, paths))
+    print(f"{len(keys)} entries in {len(paths)} pack(s), {size / 1024:.1f} KiB, {corrupt} corrupt record(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,26 @@
 import os
+import sys
 import glob
+import argparse
 from collections import defaultdict, Counter
 import numpy as np
-import scipy.stats as stats
-import matplotlib.pyplot as plt
 
-def parse_conll(filepath):
-    distances = []
-    deprels = Counter()
-    feats_counts = {'gen': Counter(), 'num': Counter(), 'case': Counter()}
-    
+# Shared morph-feature decoder and corpus cache live with the Assignment 1 analyzer
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, '1'))
+from morph import parse_morph
+from corpus import TokenStore
+from corpus_cache import CorpusCache
+from plotting import PlotQueue
+
+def read_conll(filepath):
+    """Parse every 10-column token line (punctuation included) into a TokenStore"""
+    store = TokenStore()
     with open(filepath, 'r', encoding='utf-8') as f:
         for line in f:
-            if not line.strip() or line.startswith('#'):
+            if not line.strip():
+                store.end_sentence()
+                continue
+            if line.startswith('#'):
                 continue
             cols = line.strip().split('\t')
             if len(cols) != 10:
@@ -24,42 +32,75 @@ def parse_conll(filepath):
             except ValueError:
                 continue
             
-            deprel = cols[7]
-            feats_str = cols[5]
-            
-            if head_val > 0:
-                dist = abs(id_val - head_val)
-                distances.append(dist)
-            
-            deprels[deprel] += 1
-            
-            if feats_str and feats_str != '_':
-                feats_list = feats_str.split('|')
-                for feat in feats_list:
-                    if '-' in feat:
-                        k, v = feat.split('-', 1)
-                        if k in feats_counts and v and v != '_':
-                            feats_counts[k][v] += 1
+            store.add_token(id_val, head_val, cols[1], cols[2], cols[3], cols[4], cols[5], cols[7])
+    store.end_sentence()
+    return store
+
+def load_conll(filepath, cache=None):
+    """TokenStore for filepath, from the cache when its entry is current"""
+    store = cache.get(filepath) if cache is not None else None
+    if store is None:
+        store = read_conll(filepath)
+        if cache is not None:
+            cache.put(filepath, store)
+    return store
+
+def parse_conll(filepath, cache=None):
+    store = load_conll(filepath, cache)
+    ids = store.ids
+    heads = store.heads
+    distances = [abs(ids[i] - heads[i]) for i in range(store.num_tokens) if heads[i] > 0]
+    deprels = store.count('deprel')
+    feats_counts = {'gen': Counter(), 'num': Counter(), 'case': Counter()}
+    
+    # Decode each distinct feature string once, weighted by its frequency
+    for feats_str, freq in store.count('morph').items():
+        feats = parse_morph(feats_str)
+        for k in feats_counts:
+            v = getattr(feats, k)
+            if v and v != '_':
+                feats_counts[k][v] += freq
 
     return distances, deprels, feats_counts
 
-def process():
+def plot_dep_dist(tel_dist, hin_dist, filename):
+    """Dependency distance histogram (runs in the background plotting process)"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    
+    plt.figure(figsize=(10, 5))
+    plt.hist(tel_dist, bins=range(0, 30), alpha=0.5, label='Telugu', color='blue', density=True)
+    plt.hist(hin_dist, bins=range(0, 30), alpha=0.5, label='Hindi', color='green', density=True)
+    plt.xlabel("Dependency Distance")
+    plt.ylabel("Density")
+    plt.legend()
+    plt.title("Dependency Distance Distribution")
+    plt.savefig(filename)
+    plt.close()
+
+def process(plots=True):
+    plot_queue = PlotQueue(enabled=plots)
+    
     telugu_file = '/home/vivek/python/LD3/Assignments/3/telugu_treebank-master/iiit_hcu_intra_chunk_v1.conll'
     hindi_files = glob.glob('/home/vivek/python/LD3/Assignments/3/HDTB_pre_release_version-0.05/IntraChunk/CoNLL/utf/**/*.dat', recursive=True)
     
+    cache = CorpusCache(variant='part1')
+    
     print("Parsing Telugu...")
-    tel_dist, tel_deprel, tel_feats = parse_conll(telugu_file)
+    tel_dist, tel_deprel, tel_feats = parse_conll(telugu_file, cache)
     
     print("Parsing Hindi...")
     hin_dist = []
     hin_deprel = Counter()
     hin_feats = {'gen': Counter(), 'num': Counter(), 'case': Counter()}
     for hf in hindi_files:
-        d, r, f = parse_conll(hf)
+        d, r, f = parse_conll(hf, cache)
         hin_dist.extend(d)
         hin_deprel.update(r)
         for k in hin_feats:
             hin_feats[k].update(f[k])
+    cache.save()
             
     with open('part1_output.txt', 'w', encoding='utf-8') as out:
         out.write("==== PART 1: Python Data Analysis ====\n\n")
@@ -69,15 +110,7 @@ def process():
         out.write(f"Telugu: Mean = {np.mean(tel_dist):.4f}, Median = {np.median(tel_dist)}\n")
         out.write(f"Hindi: Mean = {np.mean(hin_dist):.4f}, Median = {np.median(hin_dist)}\n\n")
         
-        plt.figure(figsize=(10, 5))
-        plt.hist(tel_dist, bins=range(0, 30), alpha=0.5, label='Telugu', color='blue', density=True)
-        plt.hist(hin_dist, bins=range(0, 30), alpha=0.5, label='Hindi', color='green', density=True)
-        plt.xlabel("Dependency Distance")
-        plt.ylabel("Density")
-        plt.legend()
-        plt.title("Dependency Distance Distribution")
-        plt.savefig('/home/vivek/python/LD3/Assignments/3/dep_dist_hist.png')
-        plt.close()
+        plot_queue.submit(plot_dep_dist, tel_dist, hin_dist, '/home/vivek/python/LD3/Assignments/3/dep_dist_hist.png')
         
         # 2. Dependency relations
         out.write("2. Top 10 Dependency Relations\n")
@@ -90,6 +123,7 @@ def process():
         out.write("\n")
         
         # 4. Significance Testing
+        import scipy.stats as stats
         t_stat, p_val = stats.ttest_ind(tel_dist, hin_dist, equal_var=False)
         out.write(f"4. Significance Testing on Dependency Distances\n")
         out.write(f"T-statistic = {t_stat:.4f}, P-value = {p_val:.4e}\n\n")
@@ -106,5 +140,10 @@ def process():
                 out.write(f"  {k}: {v}\n")
             out.write("\n")
 
+    plot_queue.wait()
+
 if __name__ == '__main__':
-    process()
+    parser = argparse.ArgumentParser(description="Part 1: Telugu vs Hindi treebank statistics.")
+    parser.add_argument("--no-plots", action="store_true", help="Skip the dependency distance histogram.")
+    args = parser.parse_args()
+    process(plots=not args.no_plots)